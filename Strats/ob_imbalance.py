@@ -1,9 +1,14 @@
 from Strats.strat_base import StrategyBase
 from order_manager import OrderManager
-from utils.events import Signal
+from utils.events import Signal, signal_pool
 from utils.order_book import OrderBook
+from utils.ob_math import weighted_imbalance
 from typing import Optional
 from collections import deque
+import logging
+import numpy as np
+
+log = logging.getLogger(__name__)
 
 class OrderBookImbalanceStrategy(StrategyBase):
     def __init__(self): # start_date, end_date, symbols, cash
@@ -11,9 +16,27 @@ class OrderBookImbalanceStrategy(StrategyBase):
         self.threshold_buy = 0.55
         self.threshold_sell = 1 - self.threshold_buy
         self.threshold_bid_proportion_change = 0.02 #in percentage
+        self.cheap_screen_margin = 0.005 # uncertainty band around the signal threshold
+        # Precomputed signed thresholds so the hot path compares against
+        # constants instead of re-negating every tick
+        self._pos_thr = self.threshold_bid_proportion_change
+        self._neg_thr = -self.threshold_bid_proportion_change
+
+        # Branchless decision table over the discretized proportion delta
+        # (avg - current), delta in [-1, 1] mapped to [0, 2000] at 0.001
+        # resolution: 1 = buy, -1 = sell, 0 = hold
+        self._lut_scale = 1000
+        delta_grid = np.arange(-self._lut_scale, self._lut_scale + 1) / self._lut_scale
+        self._decision_lut = np.zeros(2 * self._lut_scale + 1, dtype=np.int8)
+        self._decision_lut[delta_grid < self._neg_thr] = 1
+        self._decision_lut[delta_grid > self._pos_thr] = -1
         self.symbol = "BTC/USD"
         self.midprice_window = deque(maxlen=10)
         self.bid_proportion_window = deque(maxlen=10)
+        # Running sums so the rolling means are O(1) instead of
+        # re-summing the whole window every tick
+        self._mp_sum = 0.0
+        self._bp_sum = 0.0
 
     def initialize(self) -> None:
         pass
@@ -23,31 +46,62 @@ class OrderBookImbalanceStrategy(StrategyBase):
 
     def on_data(self, data: OrderBook) -> Optional[Signal]:
 
-        print("on_data")
-        
         best_bid = data.get_best_bid_price()
         best_ask = data.get_best_ask_price()
         
-        # Calculate total bid and ask volumes
-        bids = data.get_bids()  # Returns list of (price, size) tuples
-        asks = data.get_asks()  # Returns list of (price, size) tuples
-        
+        # Contiguous (price, size) float64 views backed by OrderBook's
+        # persistent buffers - no tuple unpacking or per-tick allocation
+        bids = data.bids_view()
+        asks = data.asks_view()
+
+
         if best_bid is None or best_ask is None:
-            best_bid = max(price for price, size in bids) if bids else 0
-            best_ask = min(price for price, size in asks) if asks else 0
-        
+            # Empty book - nothing to trade on (OrderBook keeps the best
+            # prices cached, so no fallback scan is needed here)
+            return None
+
         new_mid_price = (best_bid + best_ask) / 2
+        if len(self.midprice_window) == self.midprice_window.maxlen:
+            self._mp_sum -= self.midprice_window[0]  # evict oldest from running sum
         self.midprice_window.append(new_mid_price)
-        mid_price = new_mid_price #sum(self.midprice_window) / len(self.midprice_window)
+        self._mp_sum += new_mid_price
+        mid_price = new_mid_price #self._mp_sum / len(self.midprice_window)
 
-        bid_weighted_volume = sum(
-                                    size * (1 - abs(price - mid_price) / mid_price) # weight by proximity to mid price
-                                    for price, size in bids
-                                )
-        ask_weighted_volume = sum(
-                                    size * (1 - abs(price - mid_price) / mid_price) # weight by proximity to mid price
-                                    for price, size in asks
-                                )
+        # Cheap screen: OrderBook maintains running size totals, so the
+        # unweighted proportion costs O(1). The proximity weights are all
+        # close to 1, so if the unweighted estimate sits well inside the
+        # hold band the weighted O(N) pass cannot flip the verdict - skip it.
+        total_sizes = data.total_bid_size + data.total_ask_size
+        if total_sizes > 0 and self.bid_proportion_window:
+            p_cheap = data.total_bid_size / total_sizes
+            window = self.bid_proportion_window
+            # Simulate the append/evict so the screen tests the same
+            # delta the decision path would compute: against the
+            # pre-append average the eviction term (p - oldest)/n is
+            # unbounded by the margin and genuine signals get eaten
+            if len(window) == window.maxlen:
+                s_after = self._bp_sum - window[0] + p_cheap
+                n_after = len(window)
+            else:
+                s_after = self._bp_sum + p_cheap
+                n_after = len(window) + 1
+            if abs(s_after / n_after - p_cheap) < self.threshold_bid_proportion_change - self.cheap_screen_margin:
+                # Clearly a hold - keep the rolling window alive with the
+                # cheap estimate and exit before the weighted pass
+                if len(window) == window.maxlen:
+                    self._bp_sum -= window[0]
+                window.append(p_cheap)
+                self._bp_sum += p_cheap
+                return None
+
+        # Weighted volumes via the compiled kernel in utils.ob_math:
+        # column 0 is price, column 1 is size, weights decay with
+        # distance from mid. JIT beats NumPy dispatch at 10-20 levels.
+        bid_weighted_volume, ask_weighted_volume = weighted_imbalance(
+            np.ascontiguousarray(bids[:, 0]), np.ascontiguousarray(bids[:, 1]),
+            np.ascontiguousarray(asks[:, 0]), np.ascontiguousarray(asks[:, 1]),
+            mid_price
+        )
     
         if bid_weighted_volume + ask_weighted_volume == 0:
             return None
@@ -55,35 +109,52 @@ class OrderBookImbalanceStrategy(StrategyBase):
 
         # Calculate bid proportion
         bid_proportion = bid_weighted_volume / (bid_weighted_volume + ask_weighted_volume)
+        if len(self.bid_proportion_window) == self.bid_proportion_window.maxlen:
+            self._bp_sum -= self.bid_proportion_window[0]  # evict oldest from running sum
         self.bid_proportion_window.append(bid_proportion)
-        avg_bid_proportion = sum(self.bid_proportion_window) / len(self.bid_proportion_window)
+        self._bp_sum += bid_proportion
+        avg_bid_proportion = self._bp_sum / len(self.bid_proportion_window)
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Bid Proportion: %.4f, Avg Bid Proportion: %.4f", bid_proportion, avg_bid_proportion)
+        # Make trading decision via the precomputed LUT: one clamp + one
+        # table load instead of two float comparisons. Round to the
+        # nearest grid cell - flooring would bias the discretization
+        # one-sided and shift the sell threshold a full LUT step
+        delta = avg_bid_proportion - bid_proportion
+        idx = int((delta + 1.0) * self._lut_scale + 0.5)
+        idx = 0 if idx < 0 else (2 * self._lut_scale if idx > 2 * self._lut_scale else idx)
+        action = self._decision_lut[idx]
 
-        print(f"Bid Proportion: {bid_proportion:.4f}, Avg Bid Proportion: {avg_bid_proportion:.4f}")
-        # Make trading decision
         #if bid_proportion > self.threshold_buy:
-        if (avg_bid_proportion - bid_proportion) < -self.threshold_bid_proportion_change:
+        if action == 1:
             # Strong buying pressure - place buy order
-            print("ob_imbalance: buy signal")
-            return Signal(
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("ob_imbalance: buy signal")
+            return signal_pool.acquire(
                 action="buy",
                 symbol=self.symbol,
                 limit_price=best_ask,  # Buy at ask price
                 quantity=0.005, # getaccountvalue/getmidprice * 0.1
-                best_prices=(best_bid, best_ask)
+                best_bid=best_bid,
+                best_ask=best_ask
             )
         #elif bid_proportion < self.threshold_sell:
-        elif (avg_bid_proportion - bid_proportion) > self.threshold_bid_proportion_change:
+        elif action == -1:
             # Strong selling pressure - place sell order
-            print("ob_imbalance: sell signal")
-            return Signal(
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("ob_imbalance: sell signal")
+            return signal_pool.acquire(
                 action="sell",
                 symbol=self.symbol,
                 limit_price=best_bid,  # Sell at bid price
                 quantity=0.005,
-                best_prices=(best_bid, best_ask)
+                best_bid=best_bid,
+                best_ask=best_ask
             )
         else:
-            print("hold")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("hold")
             # Neutral - close positions
             # print("ob_imbalance: close signal")
             # return Signal(
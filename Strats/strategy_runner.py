@@ -1,9 +1,12 @@
 import asyncio
+import logging
 from typing import Optional
 from utils.events import Event, EventType, Signal
 from utils.order_book import OrderBook
 from Strats.strat_base import StrategyBase
 
+log = logging.getLogger(__name__)
+
 class StrategyRunner:
     """Runs strategy on orderbook updates and produces signals"""
     
@@ -17,7 +20,13 @@ class StrategyRunner:
         while True:
             try:
                 event = await self._in_q.get()
-                
+
+                # Drain any backlog without awaiting - only the freshest
+                # orderbook matters for signal generation, so stale
+                # snapshots are discarded instead of evaluated
+                while not self._in_q.empty():
+                    event = self._in_q.get_nowait()
+
                 if event.type != EventType.ORDERBOOK_UPDATE:
                     continue
                 
@@ -27,7 +36,8 @@ class StrategyRunner:
                 signal: Optional[Signal] = self._strategy.on_data(orderbook)
                 
                 if signal:
-                    print("strategy runner: signal")
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("strategy runner: signal")
                     # Emit signal event
                     signal_event = Event(
                         type=EventType.SIGNAL,
@@ -3,7 +3,9 @@ from json.tool import main
 from utils.order_book import OrderBook
 from utils.OB_snapshot_reader import OrderBookSnapshotReader
 from utils.backtesting_engine import BacktestingEngine
+from utils.log_config import setup_logging
 from utils.portfolio_tracker import PortfolioTracker
+from utils.ring import SPSCRing
 from Strats.strategy_runner import StrategyRunner
 from Strats.ob_imbalance import OrderBookImbalanceStrategy
 
@@ -23,10 +25,16 @@ class Backtester:
         pass
 
     async def run_backtest(self):
-        
-        # Create queues
-        orderbook_q = asyncio.Queue()
-        signal_q = asyncio.Queue()
+
+        # Route all logging through the queue listener so hot-path log
+        # calls never block the event loop on a stdout write
+        log_listener = setup_logging()
+
+        # Create queues (SPSC rings: each stage has one producer/consumer).
+        # Market data may overwrite stale snapshots when full; signals
+        # are lossless - a dropped SIGNAL is a silently skipped trade
+        orderbook_q = SPSCRing(overwrite=True)
+        signal_q = SPSCRing()
         
         # Create portfolio tracker
         self.portfolio_tracker = PortfolioTracker(
@@ -81,9 +89,12 @@ class Backtester:
             
             # Stop data feed
             data_feed.running = False
-            
+
             # Print backtest results
             self._print_results()
+
+            # Drain and stop the logging listener thread
+            log_listener.stop()
     
     def _print_results(self):
         """Print backtest results and export data"""
@@ -1,18 +1,37 @@
 import asyncio
+import sys
+
+# Prefer uvloop when available (POSIX only) - faster selector/futures
+# for the WS receive loop and aiohttp order submission
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
 from utils.order_book import OrderBook
 from utils.market_data_second import MarketDataStreamSecond
 from utils.events import Event, EventType
 from utils.execution_engine import ExecutionEngine
+from utils.log_config import setup_logging
+from utils.ring import SPSCRing
 from Strats.strategy_runner import StrategyRunner
 from Strats.ob_imbalance import OrderBookImbalanceStrategy
 from order_manager import OrderManager
 
 async def main():
     """Main trading system with queue-based architecture"""
-    
-    # Create queues
-    orderbook_q = asyncio.Queue()
-    signal_q = asyncio.Queue()
+
+    # Route all logging through the queue listener so hot-path log
+    # calls never block the event loop on a stdout write
+    log_listener = setup_logging()
+
+    # Create queues (SPSC rings: each stage has one producer/consumer).
+    # Market data may overwrite stale snapshots when full; signals are
+    # lossless - a dropped SIGNAL is a silently skipped trade
+    orderbook_q = SPSCRing(overwrite=True)
+    signal_q = SPSCRing()
     
     # Create orderbook
     order_book = OrderBook(symbol="BTC/USD", max_levels=10, trim_frequency=10)
@@ -58,12 +77,18 @@ async def main():
         # Cancel all tasks
         for task in tasks:
             task.cancel()
-        
+
         # Wait for tasks to finish cancellation
         await asyncio.gather(*tasks, return_exceptions=True)
-        
+
         # Stop data feed
         data_feed.running = False
 
+        # Flush batched orders and close the HTTP session/WS transport
+        await order_manager.close()
+
+        # Drain and stop the logging listener thread
+        log_listener.stop()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
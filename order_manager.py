@@ -1,7 +1,15 @@
-import requests
+import asyncio
+import aiohttp
+import itertools
 import os
+from collections import deque
 from dotenv import load_dotenv
-from utils.account_info import AccountInfo
+from utils.account_info import AccountInfo, Position
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - aiohttp falls back to stdlib json
+    orjson = None
 
 class OrderManager:
 
@@ -12,13 +20,141 @@ class OrderManager:
         return cls._instance
 
     def __init__(self):
+        # The singleton __new__ returns the same instance, but __init__
+        # still runs on every construction - without this guard each
+        # call re-parses .env and rebuilds AccountInfo (two REST calls)
+        if getattr(self, "_initialized", False):
+            return
+
         load_dotenv()
         self.api_key = os.getenv("ALPACA_KEY")
         self.api_secret = os.getenv("ALPACA_SECRET")
         self.base_url = os.getenv("ALPACA_ENDPOINT")
         self.account_info = AccountInfo()
 
-    def buy(self, symbol, limit_price, quantity = 1):
+        # Async session with a pooled keep-alive connector so orders
+        # never block the event loop and reuse one HTTPS tunnel.
+        # Created lazily on first use so it binds to the running loop.
+        self._session = None
+        self._headers = {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "APCA-API-KEY-ID": self.api_key,
+            "APCA-API-SECRET-KEY": self.api_secret
+        }
+
+        # Precomputed endpoint so the hot path skips the f-string
+        self._orders_url = f"{self.base_url}/v2/orders"
+
+        # Constant part of the order payload built once; per-order calls
+        # copy the template instead of rebuilding the whole dict
+        self._payload_template = {
+            "type": "limit",
+            "time_in_force": "ioc", # immediate or cancel
+            "symbol": None,
+            "qty": None,
+            "side": None,
+            "limit_price": None
+        }
+
+        # Optional batching: buy/sell enqueue orders and a background
+        # flush loop coalesces them into one POST per window, so K
+        # orders per tick cost ~1 HTTP round-trip instead of K
+        self.use_batch = False
+        self.batch_size = 50
+        self.max_wait_ms = 10
+        self._batch_buf = deque()
+        self._batch_event = asyncio.Event()
+        self._order_id_counter = itertools.count(1)
+        self._flush_task = None
+
+        # Optional WebSocket order entry: one authenticated duplex
+        # stream for all orders, HTTP kept as the fallback path
+        self.use_ws = False
+        self._ws_transport = None
+
+        # Local position book, updated optimistically at order send
+        # time. Between sends it is authoritative, so the buy/sell
+        # decision path is a dict lookup instead of a REST round-trip.
+        # Symbols land in _local_stale when a send fails and get
+        # reconciled against AccountInfo on the next lookup.
+        self._local_positions: dict = {}
+        self._local_stale: set = set()
+
+        self._initialized = True
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared ClientSession on the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32, ttl_dns_cache=300, keepalive_timeout=60
+                ),
+                headers=self._headers
+            )
+        return self._session
+
+    async def close(self):
+        """Flush pending batched orders, then close the WS transport
+        and the underlying HTTP session"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        # The flush loop may have been cancelled mid-window - submit
+        # whatever is still buffered before tearing the session down
+        while self._batch_buf:
+            orders = []
+            while self._batch_buf and len(orders) < self.batch_size:
+                orders.append(self._batch_buf.popleft())
+            await self.order_limit_batch(orders)
+        if self._ws_transport is not None:
+            await self._ws_transport.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def get_position(self, symbol):
+        """Local-first position lookup. Fresh cache entries answer from
+        memory; stale or missing symbols fall back to AccountInfo."""
+        if symbol in self._local_positions and symbol not in self._local_stale:
+            return self._local_positions[symbol]
+        return self._reconcile_position(symbol)
+
+    def has_position(self, symbol) -> bool:
+        """Check for an open position without hitting the API when the
+        local book is fresh"""
+        position = self.get_position(symbol)
+        return position is not None and position.qty != 0
+
+    def _reconcile_position(self, symbol):
+        """Reseed one symbol of the local book from AccountInfo"""
+        position = self.account_info.get_position(symbol)
+        if position is None:
+            self._local_positions.pop(symbol, None)
+        else:
+            self._local_positions[symbol] = position
+        self._local_stale.discard(symbol)
+        return position
+
+    def _apply_local_fill(self, symbol, quantity, side):
+        """Optimistically adjust the local book for an order just sent.
+        IOC orders either fill or cancel immediately, so the optimistic
+        qty is right in the common case; failures mark the symbol stale
+        and the next lookup reconciles against the API."""
+        position = self._local_positions.get(symbol)
+        qty = position.qty if position is not None else 0.0
+        qty += quantity if side == 'buy' else -quantity
+
+        if position is None:
+            position = Position({'symbol': symbol})
+            self._local_positions[symbol] = position
+        position.qty = qty
+        position.side = 'long' if qty >= 0 else 'short'
+        self._local_stale.discard(symbol)
+
+    async def buy(self, symbol, limit_price, quantity = 1):
         # if self.position_manager.has_position(symbol):
         #     position = self.position_manager.get_position(symbol)
         #     if position.qty > 0: # we are already long, do nothing for strat v1
@@ -26,16 +162,16 @@ class OrderManager:
         #     else:
         #         self.order_limit(symbol, quantity, bestask, 'buy')
 
-        return self.order_limit(symbol, quantity, limit_price, 'buy')
-    
-    def sell(self, symbol, limit_price, quantity = 1):
+        return await self.order_limit(symbol, quantity, limit_price, 'buy')
+
+    async def sell(self, symbol, limit_price, quantity = 1):
         # if self.position_manager.has_position(symbol):
         #     position = self.position_manager.get_position(symbol)
         #     if position.qty > 0: # we are already long, do nothing for strat v1
         #         pass
         #     else:
         #         self.order_limit(symbol, quantity, bestbid, 'sell')
-        return self.order_limit(symbol, quantity, limit_price, 'sell')
+        return await self.order_limit(symbol, quantity, limit_price, 'sell')
 
     # def close_position(self, symbol, bestask, bestbid):
     #     # Logic to close a position
@@ -47,53 +183,133 @@ class OrderManager:
     #             elif position.side == "short":
     #                 self.order_limit(symbol, position.qty, bestask, 'buy')
 
-    def liquidate(self, symbol, limit_price=None):
+    async def liquidate(self, symbol, limit_price=None):
         """
         Liquidate (close) an existing position for a symbol.
         """
 
-        position = self.account_info.get_position(symbol)
-        
+        position = self.get_position(symbol)
+
         if not position or position.qty == 0:
             print(f"No position found for {symbol}")
             return None
-    
+
         if position.side == "long":
             side = 'sell'
             qty = abs(position.qty)
         elif position.side == "short":
             side = 'buy'
             qty = abs(position.qty)
-        
-        return self.order_limit(symbol, qty, limit_price, side)
 
+        return await self.order_limit(symbol, qty, limit_price, side)
+
+
+    async def start_ws(self, url):
+        """Enable WebSocket order entry over a persistent connection"""
+        from utils.ws_order_transport import WSOrderTransport
+        self._ws_transport = WSOrderTransport(url, self.api_key, self.api_secret)
+        await self._ws_transport.start()
+        self.use_ws = True
 
-    def order_limit(self, symbol, quantity, limit_price, side):
-        endpoint = f"{self.base_url}/v2/orders"
-        payload = {
+    def start_batching(self):
+        """Enable batching and spawn the background flush task"""
+        self.use_batch = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop(), name="order_flush")
+
+    def _enqueue_order(self, symbol, quantity, limit_price, side):
+        """Buffer one order for the next batch flush. The client order id
+        lets responses be matched back to entries by index."""
+        self._batch_buf.append({
             "type": "limit",
-            "time_in_force": "ioc", # immediate or cancel
+            "time_in_force": "ioc",
             "symbol": symbol,
             "qty": quantity,
             "side": side,
-            "limit_price": limit_price
-        }
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "APCA-API-KEY-ID": self.api_key,
-            "APCA-API-SECRET-KEY": self.api_secret
-        }
+            "limit_price": limit_price,
+            "client_order_id": f"batch-{next(self._order_id_counter)}"
+        })
+        self._batch_event.set()
+
+    async def _flush_loop(self):
+        """Drain the buffer every max_wait_ms (or sooner when it fills)
+        and submit the pending orders as a single request"""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._batch_event.wait(),
+                                           timeout=self.max_wait_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+                self._batch_event.clear()
+
+                if not self._batch_buf:
+                    continue
 
+                orders = []
+                while self._batch_buf and len(orders) < self.batch_size:
+                    orders.append(self._batch_buf.popleft())
+                await self.order_limit_batch(orders)
+
+            except asyncio.CancelledError:
+                break
+
+    async def order_limit_batch(self, orders):
+        """Submit a list of order dicts as one bulk request"""
+        if not orders:
+            return None
         try:
-            response = requests.post(endpoint, json=payload, headers=headers)
-            response.raise_for_status()
-            print(f"{side} {quantity} {symbol} @ {limit_price}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            session = self._get_session()
+            async with session.post(self._orders_url, json={"orders": orders}) as response:
+                response.raise_for_status()
+                print(f"submitted batch of {len(orders)} orders")
+                return await response.json()
+        except aiohttp.ClientError as e:
             print(f"{e}")
             return None
 
+    async def order_limit(self, symbol, quantity, limit_price, side):
+        # Adjust the local book at send time so subsequent decisions in
+        # the same tick see the pending position
+        self._apply_local_fill(symbol, quantity, side)
+
+        if self.use_batch:
+            self._enqueue_order(symbol, quantity, limit_price, side)
+            return None
+
+        payload = self._payload_template.copy()
+        payload.update(symbol=symbol, qty=quantity, side=side, limit_price=limit_price)
+
+        if self.use_ws and self._ws_transport is not None:
+            try:
+                ack = await self._ws_transport.send(payload)
+                print(f"{side} {quantity} {symbol} @ {limit_price}")
+                return ack
+            except Exception as e:
+                # Fall back to HTTP if the stream is unhealthy
+                print(f"WS order entry failed, falling back to HTTP: {e}")
+
+        try:
+            session = self._get_session()
+            # Serialize on the C side when orjson is available (the
+            # session's content-type header is already application/json)
+            if orjson is not None:
+                body = {"data": orjson.dumps(payload)}
+            else:
+                body = {"json": payload}
+            async with session.post(self._orders_url, **body) as response:
+                response.raise_for_status()
+                print(f"{side} {quantity} {symbol} @ {limit_price}")
+                # Position state just changed - expire the TTL caches
+                self.account_info.invalidate()
+                return await response.json()
+        except aiohttp.ClientError as e:
+            print(f"{e}")
+            # The optimistic adjustment was wrong - reconcile this
+            # symbol from the API on the next lookup
+            self._local_stale.add(symbol)
+            return None
+
 
     def cancel_order(self, order_id):
         # Logic to cancel an order
@@ -101,4 +317,4 @@ class OrderManager:
 
     def get_order_status(self, order_id):
         # Logic to get the status of an order
-        pass
\ No newline at end of file
+        pass
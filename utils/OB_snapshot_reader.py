@@ -2,57 +2,180 @@
 import json
 import asyncio
 from typing import Optional
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to stdlib json
+    orjson = None
 from utils.order_book import OrderBook
+from utils.ob_math import merge_levels
 from utils.events import Event, EventType
 from datetime import datetime
 
 
 class OrderBookSnapshotReader:
-    """Reads saved orderbook snapshots and replays them with a delay"""
-    
-    def __init__(self, filepath: str, order_book: OrderBook, 
+    """Reads saved orderbook snapshots and replays them with a delay.
+
+    Snapshots are parsed once at load time into dense (T, max_levels)
+    numpy tables, so the replay loop is pure array indexing - no dict
+    traversal or float conversion per frame.
+    """
+
+    def __init__(self, filepath: str, order_book: OrderBook,
                  out_q: Optional[asyncio.Queue] = None,
-                 delay: float = 0, verbose: bool = False):
+                 delay: float = 0, verbose: bool = False,
+                 realtime: bool = False, speed: float = 1.0):
         """
         Initialize the snapshot reader
-        
+
         Args:
             filepath: Path to JSON file with saved snapshots
             order_book: OrderBook instance to update
             out_q: Queue to send events to
-            delay: Delay between snapshots in seconds (default: 1.0)
+            delay: Fixed delay between snapshots in seconds (ignored
+                   when realtime is set; 0 = replay as fast as possible)
             verbose: Print debug messages
+            realtime: Pace replay by the recorded timestamps
+            speed: Playback speed multiplier for realtime mode
+                   (2.0 = twice as fast as recorded)
         """
         self.filepath = filepath
         self.order_book = order_book
         self.out_q = out_q
         self.delay = delay
         self.verbose = verbose
+        self.realtime = realtime
+        self.speed = speed
         self.running = False
-        self.snapshots = []
-        
+        self.n_frames = 0
+        self._start_idx = 0
+        self._ts = None  # datetime64[ns] per frame, when parseable
+
+        # Dense per-frame tables filled by load_snapshots()
+        self._times: list = []
+        self._bid_prices = None
+        self._bid_sizes = None
+        self._ask_prices = None
+        self._ask_sizes = None
+        self._n_bids = None
+        self._n_asks = None
+        self._bid_totals = None
+        self._ask_totals = None
+
     def load_snapshots(self):
-        """Load all snapshots from file"""
-        with open(self.filepath, 'r') as f:
-            self.snapshots = json.load(f)
-        
+        """Load all snapshots and convert them to dense numpy tables"""
+        # One whole-file read + C-side parse beats json.load's
+        # incremental reader wrapper on large snapshot files
+        with open(self.filepath, 'rb') as f:
+            contents = f.read()
+        loads = orjson.loads if orjson is not None else json.loads
+        if contents.lstrip()[:1] == b'[':
+            # Legacy format: one JSON array holding every record
+            raw = loads(contents)
+        else:
+            # NDJSON (what record_orderbook writes): one record per line
+            lines = [ln for ln in contents.splitlines() if ln.strip()]
+            raw = []
+            for i, line in enumerate(lines):
+                try:
+                    raw.append(loads(line))
+                except ValueError:
+                    # A hard kill can leave a half-written final line;
+                    # skip it rather than losing the whole recording
+                    if i == len(lines) - 1:
+                        print(f"Warning: skipping truncated trailing "
+                              f"line in {self.filepath}")
+                    else:
+                        raise
+
+        T = len(raw)
+        L = self.order_book.max_levels
+
+        self._times = [None] * T
+        self._bid_prices = np.full((T, L), np.nan)
+        self._bid_sizes = np.full((T, L), np.nan)
+        self._ask_prices = np.full((T, L), np.nan)
+        self._ask_sizes = np.full((T, L), np.nan)
+        self._n_bids = np.zeros(T, dtype=np.int64)
+        self._n_asks = np.zeros(T, dtype=np.int64)
+        self._bid_totals = np.zeros(T)
+        self._ask_totals = np.zeros(T)
+
+        for t, snapshot in enumerate(raw):
+            self._times[t] = snapshot.get('time')
+            data = snapshot.get('data', {})
+
+            # Materialize each side once, then let the compiled kernel
+            # filter empty levels and pack the row contiguously.
+            # Levels come either as [price, size] pairs (current
+            # recorder) or {"price", "size"} dicts (legacy files).
+            bids = data.get('bids', [])
+            if bids and isinstance(bids[0], dict):
+                bids = [(b.get('price', 0.0), b.get('size', 0.0)) for b in bids]
+            prices = np.fromiter((b[0] for b in bids),
+                                 dtype=np.float64, count=len(bids))
+            sizes = np.fromiter((b[1] for b in bids),
+                                dtype=np.float64, count=len(bids))
+            n = merge_levels(prices, sizes, self._bid_prices[t], self._bid_sizes[t])
+            # Bids are recorded lowest-first; flip once at load so the
+            # dense table is best-first like the live book
+            self._bid_prices[t, :n] = self._bid_prices[t, :n][::-1]
+            self._bid_sizes[t, :n] = self._bid_sizes[t, :n][::-1]
+            self._n_bids[t] = n
+            self._bid_totals[t] = self._bid_sizes[t, :n].sum()
+
+            asks = data.get('asks', [])
+            if asks and isinstance(asks[0], dict):
+                asks = [(a.get('price', 0.0), a.get('size', 0.0)) for a in asks]
+            prices = np.fromiter((a[0] for a in asks),
+                                 dtype=np.float64, count=len(asks))
+            sizes = np.fromiter((a[1] for a in asks),
+                                dtype=np.float64, count=len(asks))
+            n = merge_levels(prices, sizes, self._ask_prices[t], self._ask_sizes[t])
+            self._n_asks[t] = n
+            self._ask_totals[t] = self._ask_sizes[t, :n].sum()
+
+        self.n_frames = T
+
+        # Parse timestamps once so replay pacing and seek are array ops
+        # (trailing 'Z' is stripped - numpy treats datetime64 as naive)
+        try:
+            cleaned = [t.rstrip('Z') if isinstance(t, str) else t for t in self._times]
+            self._ts = np.array(cleaned, dtype='datetime64[ns]')
+        except (ValueError, TypeError):
+            self._ts = None  # fall back to fixed-delay pacing
+
         if self.verbose:
-            print(f"Loaded {len(self.snapshots)} snapshots from {self.filepath}")
-    
+            print(f"Loaded {T} snapshots from {self.filepath}")
+
+    def seek(self, when) -> int:
+        """
+        Position replay at the first frame at or after `when`
+        (anything np.datetime64 accepts). O(log T) via binary search.
+
+        Returns:
+            The frame index replay will start from
+        """
+        if self._ts is None:
+            raise ValueError("snapshots have no parseable timestamps")
+        self._start_idx = int(np.searchsorted(self._ts, np.datetime64(when)))
+        return self._start_idx
+
     async def connect(self):
         """Simulate connection - replay snapshots with delay"""
         self.load_snapshots()
         self.running = True
-        
+
         snapshot_count = 0
-        
-        for snapshot in self.snapshots:
+
+        for t in range(self._start_idx, self.n_frames):
             if not self.running:
                 break
-            
-            # Update orderbook
-            self._update_orderbook(snapshot)
-            
+
+            # Update orderbook by pointing it at the preparsed frame
+            self._apply_frame(t)
+
             # Send event if queue exists
             if self.out_q:
                 event = Event(
@@ -60,76 +183,85 @@ class OrderBookSnapshotReader:
                     payload=self.order_book
                 )
                 await self.out_q.put(event)
-            
+
             snapshot_count += 1
-            
+
             if self.verbose and snapshot_count % 10 == 0:
-                print(f"Processed {snapshot_count}/{len(self.snapshots)} snapshots")
-            
-            # Wait before next snapshot
-            await asyncio.sleep(self.delay)
-        
+                print(f"Processed {snapshot_count}/{self.n_frames} snapshots")
+
+            # Pace the replay: honor recorded timestamps in realtime
+            # mode, otherwise use the fixed delay
+            if self.realtime and self._ts is not None and t + 1 < self.n_frames:
+                gap = (self._ts[t + 1] - self._ts[t]) / np.timedelta64(1, 's')
+                if gap > 0:
+                    await asyncio.sleep(gap / self.speed)
+            elif self.delay:
+                await asyncio.sleep(self.delay)
+            else:
+                # Fast-as-possible mode still has to yield: the ring's
+                # put never awaits, so without a checkpoint here the
+                # whole file replays before the strategy task runs once
+                await asyncio.sleep(0)
+
         if self.verbose:
             print(f"Finished replaying {snapshot_count} snapshots")
-        
+
         self.running = False
-    
-    def _update_orderbook(self, snapshot: dict):
-        """Update orderbook from snapshot data"""
-        data = snapshot.get('data', {})
-        
-        # Clear existing orderbook
-        self.order_book.bids.clear()
-        self.order_book.asks.clear()
-        
-        # Update bids
-        for bid in data.get('bids', []):
-            price = bid.get('price')
-            size = bid.get('size')
-            if price and size:
-                self.order_book.bids[price] = size
-        
-        # Update asks
-        for ask in data.get('asks', []):
-            price = ask.get('price')
-            size = ask.get('size')
-            if price and size:
-                self.order_book.asks[price] = size
-        
-        # Update timestamp if available
-        if 'time' in snapshot:
-            self.order_book.last_update = snapshot['time']
+
+    def _apply_frame(self, t: int):
+        """Write frame t into the orderbook's back buffers and publish
+        them with a swap, so a consumer holding last tick's view never
+        sees this frame half-copied. The dense tables hold both sides
+        best-first, so this is a straight copy."""
+        book = self.order_book
+        n_b = int(self._n_bids[t])
+        n_a = int(self._n_asks[t])
+
+        book._bids_back[:n_b, 0] = self._bid_prices[t, :n_b]
+        book._bids_back[:n_b, 1] = self._bid_sizes[t, :n_b]
+        book._asks_back[:n_a, 0] = self._ask_prices[t, :n_a]
+        book._asks_back[:n_a, 1] = self._ask_sizes[t, :n_a]
+        book.publish_bids(n_b)
+        book.publish_asks(n_a)
+
+        # The primary level arrays back get_bids/get_asks and the
+        # print/record paths, so fill them too - a replayed book must
+        # look the same from every accessor, not just the views. Bid
+        # prices are stored negated so best-first copies in ascending.
+        np.negative(self._bid_prices[t, :n_b], out=book._bid_px[:n_b])
+        book._bid_sz[:n_b] = self._bid_sizes[t, :n_b]
+        book._ask_px[:n_a] = self._ask_prices[t, :n_a]
+        book._ask_sz[:n_a] = self._ask_sizes[t, :n_a]
+        book.n_bids = n_b
+        book.n_asks = n_a
+        book._bids_cache = None
+        book._asks_cache = None
+
+        book.total_bid_size = self._bid_totals[t]
+        book.total_ask_size = self._ask_totals[t]
+        book._best_bid = self._bid_prices[t, 0] if n_b else None
+        book._best_bid_sz = self._bid_sizes[t, 0] if n_b else None
+        book._best_ask = self._ask_prices[t, 0] if n_a else None
+        book._best_ask_sz = self._ask_sizes[t, 0] if n_a else None
+        book.last_update_time = self._times[t]
 
     def compute_volume(self):
         """Compute total bid and ask volumes for each orderbook"""
         self.load_snapshots()
-        
-        for snapshot in self.snapshots:
-            data = snapshot.get('data', {})
-
-
-            best_bid = max(bid['price'] for bid in data.get('bids', []))
-            best_ask = min(ask['price'] for ask in data.get('asks', []))
-            mid_price = (best_bid + best_ask) / 2
 
-            bid_volume = sum(bid.get('size', 0) for bid in data.get('bids', []))
-            ask_volume = sum(ask.get('size', 0) for ask in data.get('asks', []))
+        # Vectorized over all frames: weight each level by proximity to
+        # the per-frame mid price (NaN padding drops out via nansum)
+        best_bid = self._bid_prices[:, 0]
+        best_ask = self._ask_prices[:, 0]
+        mid_price = (best_bid + best_ask) / 2
 
-            bid_weighted_volume = sum(
-                                        bid.get('size', 0) * (1 - abs(bid.get('price', 0) - mid_price) / mid_price) # weight by proximity to mid price
-                                        for bid in data.get('bids', [])
-                                    )
-            ask_weighted_volume = sum(
-                                        ask.get('size', 0) * (1 - abs(ask.get('price', 0) - mid_price) / mid_price) # weight by proximity to mid price
-                                        for ask in data.get('asks', [])
-                                    )
+        w_b = 1 - np.abs(self._bid_prices - mid_price[:, None]) / mid_price[:, None]
+        w_a = 1 - np.abs(self._ask_prices - mid_price[:, None]) / mid_price[:, None]
+        bid_weighted_volume = np.nansum(self._bid_sizes * w_b, axis=1)
+        ask_weighted_volume = np.nansum(self._ask_sizes * w_a, axis=1)
 
+        proportion = bid_weighted_volume / (bid_weighted_volume + ask_weighted_volume)
+        for p in proportion:
+            print(f"proportion of bids: {p} ")
 
-            timestamp = snapshot.get('time', 'N/A')
-            #print(f"Total Bid Volume: {bid_weighted_volume} | Total Ask Volume: {ask_weighted_volume}")
-            print(f"proportion of bids: {bid_weighted_volume / (bid_weighted_volume + ask_weighted_volume)} ")
-        
         return 'ok'
-            
-        
-    
\ No newline at end of file
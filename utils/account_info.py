@@ -6,6 +6,9 @@ import datetime as dt
 from typing import Dict, List, Optional
 
 import os
+import json
+import time
+import zlib
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,13 +20,31 @@ Alpaca_secret = os.getenv("ALPACA_SECRET")
 
 class Position:
     """Represents a single position from the Alpaca API"""
-    
+
+    # __slots__ avoids a per-instance __dict__; the class-level field
+    # tables drive conversion so construction is one tight loop instead
+    # of repeated .get() + float() calls per attribute
+    __slots__ = ('qty', 'unrealized_pl', 'side', 'symbol', 'market_value')
+
+    _FLOAT_FIELDS = ('qty', 'unrealized_pl', 'market_value')
+    _STR_FIELDS = ('side', 'symbol')
+
     def __init__(self, data: dict):
-        self.qty: float = float(data.get("qty", 0))
-        self.unrealized_pl: float = float(data.get("unrealized_pl", 0))
-        self.side: str = data.get("side", "")
-        self.symbol: str = data.get("symbol", "")
-        self.market_value: float = float(data.get("market_value", 0))
+        self.update_from_dict(data)
+
+    def update_from_dict(self, data: dict) -> None:
+        """Reassign fields in place so existing objects can be refreshed
+        without allocating a new Position per poll."""
+        for field in self._FLOAT_FIELDS:
+            value = data.get(field)
+            setattr(self, field, float(value) if value is not None else 0.0)
+        for field in self._STR_FIELDS:
+            setattr(self, field, data.get(field, ""))
+
+    def to_dict(self) -> dict:
+        """Serialize as native types - floats stay floats so the JSON
+        encoder formats them on the C side instead of via str()."""
+        return {field: getattr(self, field) for field in self.__slots__}
 
 
 class AccountInfo:
@@ -33,18 +54,38 @@ class AccountInfo:
         self.api = tradeapi.REST(Alpaca_key, Alpaca_secret, Alpaca_endpoint)
         self._account = None
         self.positions: Dict[str, Position] = {}
+        # SoA columns rebuilt on refresh so portfolio totals are single
+        # vectorized reductions instead of Python loops over objects
+        self._market_values = np.empty(0, dtype=np.float64)
+        self._unrealized_pls = np.empty(0, dtype=np.float64)
+        self._last_positions_hash: Optional[int] = None
+
+        # Short-TTL memoization: consecutive getter calls within the TTL
+        # reuse the cached snapshot instead of issuing a REST call each
+        self.ttl = 0.2  # seconds
+        self._acct_ts = float('-inf')
+        self._pos_ts = float('-inf')
+
         self._refresh_account()
         self._refresh_positions()
     
     def _refresh_account(self):
-        """Refresh account information from API"""
+        """Refresh account information from API (TTL-cached)"""
+        now = time.monotonic()
+        if now - self._acct_ts < self.ttl:
+            return
+        self._acct_ts = now
         self._account = self.api.get_account()
-    
+
     def _refresh_positions(self):
-        """Refresh positions from API"""
+        """Refresh positions from API (TTL-cached)"""
+        now = time.monotonic()
+        if now - self._pos_ts < self.ttl:
+            return
+        self._pos_ts = now
         api_positions = self.api.list_positions()
-        self.positions.clear()
-        
+
+        incoming = {}
         for pos_data in api_positions:
             # Handle if it's already a Position object from alpaca library
             if hasattr(pos_data, '__dict__'):
@@ -55,12 +96,46 @@ class AccountInfo:
                     pos_dict = {k: v for k, v in pos_data.__dict__.items() if not k.startswith('_')}
             else:
                 pos_dict = pos_data
-            
-            position = Position(pos_dict)
-            self.positions[position.symbol] = position
-    
+
+            incoming[pos_dict.get("symbol", "")] = pos_dict
+
+        # Positions rarely change between polls - checksum the payload
+        # and skip the whole diff/rebuild when nothing moved
+        payload_hash = zlib.crc32(
+            json.dumps(incoming, sort_keys=True, default=str).encode()
+        )
+        if payload_hash == self._last_positions_hash:
+            return
+        self._last_positions_hash = payload_hash
+
+        # Diff against the current book instead of clear+rebuild:
+        # mutate existing Positions in place, add new ones, drop closed ones
+        for symbol in self.positions.keys() - incoming.keys():
+            del self.positions[symbol]
+        for symbol, pos_dict in incoming.items():
+            existing = self.positions.get(symbol)
+            if existing is not None:
+                existing.update_from_dict(pos_dict)
+            else:
+                self.positions[symbol] = Position(pos_dict)
+
+        # Rebuild the SoA columns in one pass
+        n = len(self.positions)
+        self._market_values = np.empty(n, dtype=np.float64)
+        self._unrealized_pls = np.empty(n, dtype=np.float64)
+        for i, pos in enumerate(self.positions.values()):
+            self._market_values[i] = pos.market_value
+            self._unrealized_pls[i] = pos.unrealized_pl
+    
+    def invalidate(self):
+        """Expire the TTL caches - call after an order fills so the next
+        read hits the API instead of a stale snapshot"""
+        self._acct_ts = float('-inf')
+        self._pos_ts = float('-inf')
+
     def refresh(self):
-        """Refresh both account info and positions"""
+        """Force-refresh both account info and positions"""
+        self.invalidate()
         self._refresh_account()
         self._refresh_positions()
     
@@ -115,9 +190,9 @@ class AccountInfo:
     def get_total_market_value(self) -> float:
         """Get total market value of all positions"""
         self._refresh_positions()
-        return sum(pos.market_value for pos in self.positions.values())
-    
+        return float(self._market_values.sum())
+
     def get_total_unrealized_pl(self) -> float:
         """Get total unrealized P&L across all positions"""
         self._refresh_positions()
-        return sum(pos.unrealized_pl for pos in self.positions.values())
\ No newline at end of file
+        return float(self._unrealized_pls.sum())
\ No newline at end of file
@@ -1,5 +1,5 @@
 import asyncio
-from utils.events import Event, EventType, Signal
+from utils.events import Event, EventType, Signal, signal_pool
 from utils.portfolio_tracker import PortfolioTracker
 from typing import Optional
 from datetime import datetime
@@ -26,38 +26,54 @@ class BacktestingEngine:
         
         
     async def run(self):
-        """Main loop: read signals and execute trades"""
+        """Main loop: read signals and execute trades.
+
+        Signals are drained in bursts and only one mark-to-market
+        snapshot is recorded per burst - a dense stream of K signals in
+        one tick costs K trade records but a single snapshot, instead
+        of K full position walks.
+        """
         while True:
             try:
-                event = await self._in_q.get()
-                
-                if event.type != EventType.SIGNAL:
-                    continue
-                
-                signal: Signal = event.payload
+                batch = [await self._in_q.get()]
+                while not self._in_q.empty():
+                    batch.append(self._in_q.get_nowait())
+
                 timestamp = datetime.now()
-                
-                # Update last known price
-                if signal.limit_price is not None:
-                    self._last_prices[signal.symbol] = signal.limit_price
-                
-                if signal.action in ["buy", "sell", "close"]:
-                    self.portfolio_tracker.record_trade(
+                dirty = False
+
+                for event in batch:
+                    if event.type != EventType.SIGNAL:
+                        continue
+
+                    signal: Signal = event.payload
+
+                    # Update last known price
+                    if signal.limit_price is not None:
+                        self._last_prices[signal.symbol] = signal.limit_price
+
+                    if signal.action in ["buy", "sell", "close"]:
+                        self.portfolio_tracker.record_trade(
+                            timestamp=timestamp,
+                            symbol=signal.symbol,
+                            action=signal.action,
+                            quantity=signal.quantity,
+                            price=signal.limit_price,
+                            best_bid=signal.best_bid,
+                            best_ask=signal.best_ask
+                        )
+                    dirty = True
+
+                    # Return the signal to the pool for reuse
+                    signal_pool.release(signal)
+
+                # One end-of-batch mark-to-market across all positions
+                if dirty:
+                    self.portfolio_tracker.record_portfolio_snapshot(
                         timestamp=timestamp,
-                        symbol=signal.symbol,
-                        action=signal.action,
-                        quantity=signal.quantity,
-                        price=signal.limit_price,
-                        best_bid=signal.best_prices[0],
-                        best_ask=signal.best_prices[1]                        
+                        current_prices=self._last_prices
                     )
-                
-                # Record portfolio snapshot after each trade
-                self.portfolio_tracker.record_portfolio_snapshot(
-                    timestamp=timestamp,
-                    current_prices=self._last_prices
-                )
-                    
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -1,4 +1,5 @@
 from enum import Enum
+from time import monotonic_ns
 from typing import Any, Optional
 from dataclasses import dataclass
 
@@ -9,23 +10,63 @@ class EventType(Enum):
     ORDER_FILLED = "order_filled"
     ORDER_CANCELLED = "order_cancelled"
 
-@dataclass
+@dataclass(slots=True)
 class Event:
-    """Event container for queue-based communication"""
+    """Event container for queue-based communication.
+    Default timestamp is integer monotonic nanoseconds - cheap to take
+    and safe for latency measurement. Data feeds may override it with
+    the exchange timestamp."""
     type: EventType
     payload: Any
-    timestamp: Optional[float] = None
-    
+    timestamp: Optional[Any] = None
+
     def __post_init__(self):
         if self.timestamp is None:
-            import time
-            self.timestamp = time.time()
+            self.timestamp = monotonic_ns()
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     """Trading signal from strategy"""
     action: str  # "buy", "sell", "close"
     symbol: str
     limit_price: float
     quantity: float = 1.0
-    best_prices: Optional[tuple] = (0.0, 0.0)  # (best_bid, best_ask)
\ No newline at end of file
+    # Scalars instead of a (best_bid, best_ask) tuple: saves a tuple
+    # allocation per signal and two index ops downstream
+    best_bid: float = 0.0
+    best_ask: float = 0.0
+
+
+class SignalPool:
+    """
+    Reuses Signal objects between strategy and execution so the hot
+    pipeline does not allocate (and later GC) a fresh Signal per tick.
+    acquire() hands out a recycled Signal with fields overwritten;
+    the consumer calls release() once the signal is processed.
+    """
+
+    def __init__(self, size: int = 32):
+        self._free = [Signal(action="", symbol="", limit_price=0.0) for _ in range(size)]
+
+    def acquire(self, action: str, symbol: str, limit_price: float,
+                quantity: float = 1.0,
+                best_bid: float = 0.0, best_ask: float = 0.0) -> Signal:
+        if self._free:
+            signal = self._free.pop()
+            signal.action = action
+            signal.symbol = symbol
+            signal.limit_price = limit_price
+            signal.quantity = quantity
+            signal.best_bid = best_bid
+            signal.best_ask = best_ask
+            return signal
+        # Pool exhausted - fall back to a fresh allocation
+        return Signal(action=action, symbol=symbol, limit_price=limit_price,
+                      quantity=quantity, best_bid=best_bid, best_ask=best_ask)
+
+    def release(self, signal: Signal) -> None:
+        self._free.append(signal)
+
+
+# Shared pool for the strategy -> execution pipeline
+signal_pool = SignalPool()
\ No newline at end of file
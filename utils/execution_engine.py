@@ -1,45 +1,57 @@
 import asyncio
-from utils.events import Event, EventType, Signal
+from utils.events import Event, EventType, Signal, signal_pool
 from order_manager import OrderManager
 
 class ExecutionEngine:
     """Executes trading signals using OrderManager"""
-    
+
     def __init__(self, in_q: asyncio.Queue, order_manager: OrderManager):
         self._in_q = in_q
         self._order_manager = order_manager
-        
+
     async def run(self):
         """Main loop: read signals and execute trades"""
         while True:
             try:
                 event = await self._in_q.get()
-                
-                if event.type != EventType.SIGNAL:
+
+                # Drain any burst so concurrent orders overlap their
+                # network latency instead of serializing per RTT
+                batch = [event]
+                while not self._in_q.empty():
+                    batch.append(self._in_q.get_nowait())
+
+                signals = [e.payload for e in batch if e.type == EventType.SIGNAL]
+                if not signals:
                     continue
-                
-                signal: Signal = event.payload
-                
-                # Execute trade based on signal
-                if signal.action == "buy":
-                    self._order_manager.buy(
-                        symbol=signal.symbol,
-                        limit_price=signal.limit_price,
-                        quantity=signal.quantity
-                    )
-                elif signal.action == "sell":
-                    self._order_manager.sell(
-                        symbol=signal.symbol,
-                        limit_price=signal.limit_price,
-                        quantity=signal.quantity
-                    )
-                elif signal.action == "close":
-                    self._order_manager.liquidate(
-                        symbol=signal.symbol,
-                        limit_price=signal.limit_price
-                    )
-                    
+
+                await asyncio.gather(*(self._execute(s) for s in signals))
+
+                # Return the signals to the pool for reuse
+                for signal in signals:
+                    signal_pool.release(signal)
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"Error in execution engine: {e}", flush=True)
\ No newline at end of file
+                print(f"Error in execution engine: {e}", flush=True)
+
+    async def _execute(self, signal: Signal):
+        """Execute a single trade based on the signal"""
+        if signal.action == "buy":
+            await self._order_manager.buy(
+                symbol=signal.symbol,
+                limit_price=signal.limit_price,
+                quantity=signal.quantity
+            )
+        elif signal.action == "sell":
+            await self._order_manager.sell(
+                symbol=signal.symbol,
+                limit_price=signal.limit_price,
+                quantity=signal.quantity
+            )
+        elif signal.action == "close":
+            await self._order_manager.liquidate(
+                symbol=signal.symbol,
+                limit_price=signal.limit_price
+            )
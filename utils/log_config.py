@@ -0,0 +1,31 @@
+import logging
+import logging.handlers
+import queue
+
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Configure root logging through a QueueHandler so log writes never
+    block the asyncio event loop. The actual stdout write happens on the
+    listener's background thread.
+
+    Args:
+        level: Root log level (default: INFO)
+
+    Returns:
+        The started QueueListener (call .stop() on shutdown)
+    """
+    log_q = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s")
+    )
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_q))
+
+    listener = logging.handlers.QueueListener(log_q, stream_handler)
+    listener.start()
+    return listener
@@ -7,6 +7,25 @@ from utils.order_book import OrderBook
 from typing import Optional
 import sys
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to stdlib json
+    orjson = None
+
+# uvloop is a drop-in libuv event loop - big win for WS-heavy I/O.
+# Optional and POSIX-only; asyncio.run picks up the installed policy.
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+# Bound once at import: C-accelerated parse/serialize when available
+# (websockets' send expects str, hence the decode on dumps)
+_loads = orjson.loads if orjson is not None else json.loads
+_dumps = (lambda obj: orjson.dumps(obj).decode()) if orjson is not None else json.dumps
+
 load_dotenv()
 
 class MarketDataStream:
@@ -26,7 +45,20 @@ class MarketDataStream:
         self.ws = None
         self.verbose = verbose
         self.message_count = 0
-        
+
+        # Serialized once at construction: reconnects resend the cached
+        # frames instead of re-encoding the same JSON every time
+        # (kept as str so websockets sends text frames, as Alpaca expects)
+        self._auth_frame = _dumps({
+            "action": "auth",
+            "key": self.api_key,
+            "secret": self.api_secret
+        })
+        self._subscribe_frame = _dumps({
+            "action": "subscribe",
+            "orderbooks": ["BTC/USD"]
+        })
+
     async def connect(self):
         """Connect to WebSocket and handle messages"""
         try:
@@ -34,31 +66,26 @@ class MarketDataStream:
                 self.ws_url,
                 ping_interval=20,
                 ping_timeout=10,
-                max_size=10**7  # 10MB max message size
+                max_size=10**7,  # 10MB max message size
+                # Deflate on tiny JSON frames costs more CPU than the
+                # bytes it saves, and a deeper receive queue absorbs
+                # bursts instead of dropping frames to backpressure
+                compression=None,
+                max_queue=2**14
             ) as websocket:
                 self.ws = websocket
-                
-                # Authenticate
-                auth_message = {
-                    "action": "auth",
-                    "key": self.api_key,
-                    "secret": self.api_secret
-                }
-                await websocket.send(json.dumps(auth_message))
-                
-                # Subscribe
-                subscribe_message = {
-                    "action": "subscribe",
-                    "orderbooks": ["BTC/USD"]
-                }
-                await websocket.send(json.dumps(subscribe_message))
+
+                # Authenticate and subscribe with the cached frames
+                await websocket.send(self._auth_frame)
+                await websocket.send(self._subscribe_frame)
                 if self.verbose:
                     print("Subscribed to BTCUSD", flush=True)
                 
-                # Process messages asynchronously - this is the key for speed
+                # Await each message inline: spawning a task per frame
+                # just queues thousands of tasks under load, while inline
+                # processing gives natural back-pressure
                 async for message in websocket:
-                    # Process immediately without blocking
-                    asyncio.create_task(self.on_message(message))
+                    await self.on_message(message)
                     
         except Exception as e:
             print(f"Connection error: {e}", file=sys.stderr, flush=True)
@@ -68,32 +95,32 @@ class MarketDataStream:
         """Handle incoming messages asynchronously"""
         try:
             # Fast JSON parsing
-            data = json.loads(message)
+            data = _loads(message)
             
             if isinstance(data, list):
-                # Process list of messages in parallel
-                tasks = [self.process_message(msg) for msg in data]
-                await asyncio.gather(*tasks)
+                # CPU-only work - a plain loop, nothing to overlap
+                for msg in data:
+                    self.process_message(msg)
             else:
-                await self.process_message(data)
-                
+                self.process_message(data)
+
         except Exception as e:
             if self.verbose:
                 print(f"Error processing message: {e}", file=sys.stderr, flush=True)
-    
-    async def process_message(self, msg):
+
+    def process_message(self, msg):
         """Process a single message - optimized for speed"""
         self.message_count += 1
-        
+
         # Only print if verbose (printing is slow!)
         if self.verbose:
             print(f"Received: {msg}", flush=True)
-        
-        # Update order book if provided
+
+        # Update order book if provided. The update is a cheap dict
+        # operation - calling it inline avoids the executor hand-off
+        # (thread wake + future alloc) that dwarfed the actual work
         if self.order_book is not None and isinstance(msg, dict):
-            # Run CPU-bound work in executor to avoid blocking event loop
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.order_book.update, msg)
+            self.order_book.update(msg)
     
     def start(self):
         """Start the async WebSocket stream"""
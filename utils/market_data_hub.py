@@ -0,0 +1,179 @@
+import os
+import json
+import inspect
+import asyncio
+import websockets
+from dotenv import load_dotenv
+from utils.order_book import OrderBook
+from typing import Dict, Optional
+import sys
+from utils.events import Event, EventType
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to stdlib json
+    orjson = None
+
+# Bound once at import: C-accelerated parse/serialize when available
+# (websockets' send expects str, hence the decode on dumps)
+_loads = orjson.loads if orjson is not None else json.loads
+_dumps = (lambda obj: orjson.dumps(obj).decode()) if orjson is not None else json.dumps
+
+load_dotenv()
+
+class MarketDataHub:
+    """
+    Multi-symbol market data multiplexer.
+
+    One WebSocket carries all subscriptions: K symbols cost one TLS
+    handshake, one ping/pong timer, and one receive loop instead of K
+    of each. Incoming orderbook messages are dispatched to the
+    per-symbol OrderBook by a dict lookup, and a 1 Hz sampler emits one
+    ORDERBOOK_UPDATE event per symbol per second.
+    """
+
+    def __init__(self, books: Dict[str, OrderBook],
+                 verbose: bool = False,
+                 out_q: Optional[asyncio.Queue] = None):
+        """
+        Initialize the hub.
+
+        Args:
+            books: Mapping of symbol -> OrderBook to keep current
+            verbose: If True, print each sampled book (slow)
+            out_q: Queue to send ORDERBOOK_UPDATE events to
+        """
+        self.api_key = os.getenv("ALPACA_KEY")
+        self.api_secret = os.getenv("ALPACA_SECRET")
+        # Interned keys so per-message dispatch can hit on identity
+        self.books = {sys.intern(sym): book for sym, book in books.items()}
+        self.ws_url = "wss://stream.data.alpaca.markets/v1beta3/crypto/us"
+        self.ws = None
+        self.verbose = verbose
+        self.out_q = out_q
+
+        self.message_count = 0
+        self.running = False
+        self._time = None  # bound to the running loop's clock in connect()
+
+        # Serialized once: one subscribe frame covers every symbol
+        self._auth_frame = _dumps({
+            "action": "auth",
+            "key": self.api_key,
+            "secret": self.api_secret
+        })
+        self._subscribe_frame = _dumps({
+            "action": "subscribe",
+            "orderbooks": list(self.books)
+        })
+
+    async def connect(self):
+        """Connect, subscribe all symbols at once, and keep every local
+        book current while the sampler emits per-symbol events"""
+        try:
+            async with websockets.connect(
+                self.ws_url,
+                ping_interval=20,
+                ping_timeout=10,
+                max_size=2**20,
+                max_queue=32,
+                write_limit=2**16,
+                compression=None
+            ) as websocket:
+                self.ws = websocket
+                self.running = True
+                self._time = asyncio.get_running_loop().time
+
+                await websocket.send(self._auth_frame)
+                await websocket.send(self._subscribe_frame)
+
+                async with asyncio.TaskGroup() as tg:
+                    sampler_task = tg.create_task(self.sampler())
+                    try:
+                        await self.process_messages(websocket)
+                    finally:
+                        self.running = False
+                        sampler_task.cancel()
+
+        except Exception as e:
+            print(f"Connection error: {e}", file=sys.stderr, flush=True)
+            raise
+
+    async def process_messages(self, websocket):
+        """
+        Receive loop: parse each frame and route orderbook messages to
+        the matching symbol's book.
+        """
+        loads = _loads
+        books = self.books
+
+        def handle(message):
+            try:
+                data = loads(message)
+            except ValueError:
+                return
+
+            messages = data if isinstance(data, list) else [data]
+
+            for msg in messages:
+                if not isinstance(msg, dict) or msg.get('T') != 'o':
+                    continue
+                book = books.get(msg.get('S'))
+                if book is None:
+                    continue
+                self.message_count += 1
+                # Routing already validated 'T' and 'S' - skip the
+                # book's own guards and hand over the fields directly
+                book.update_fields(msg.get('t'), msg.get('b'),
+                                   msg.get('a'), msg.get('r', False))
+
+        # Raw bytes path when the installed websockets supports it
+        if 'decode' in inspect.signature(websocket.recv).parameters:
+            try:
+                while True:
+                    handle(await websocket.recv(decode=False))
+            except websockets.exceptions.ConnectionClosedOK:
+                pass
+        else:
+            async for message in websocket:
+                handle(message)
+
+    async def sampler(self):
+        """
+        Once per second, emit an ORDERBOOK_UPDATE per symbol whose book
+        has received data. Deadline-based so jitter doesn't accumulate.
+        """
+        deadline = self._time()
+
+        while self.running:
+            for book in self.books.values():
+                if book.last_update_time is None:
+                    continue
+                if self.verbose:
+                    book.print_orderbook()
+                if self.out_q is not None:
+                    event = Event(
+                        type=EventType.ORDERBOOK_UPDATE,
+                        payload=book,
+                        timestamp=book.last_update_time
+                    )
+                    await self.out_q.put(event)
+
+            deadline += 1.0
+            now = self._time()
+            if deadline < now:
+                deadline = now
+            await asyncio.sleep(deadline - now)
+
+    def start(self):
+        """Start the async WebSocket stream"""
+        try:
+            asyncio.run(self.connect())
+        except KeyboardInterrupt:
+            if self.verbose:
+                print(f"\nProcessed {self.message_count} messages", flush=True)
+            self.running = False
+
+    def stop(self):
+        """Stop the WebSocket stream"""
+        self.running = False
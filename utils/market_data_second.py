@@ -1,252 +1,321 @@
 import os
 import json
+import inspect
 import asyncio
+import threading
 import websockets
 from dotenv import load_dotenv
 from utils.order_book import OrderBook
 from typing import Optional
 import sys
-from datetime import datetime
 from utils.events import Event, EventType
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to stdlib json
+    orjson = None
+
+# uvloop is a drop-in libuv event loop - big win for WS-heavy I/O.
+# Optional and POSIX-only; start()'s asyncio.run picks up the policy.
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+# Bound once at import: C-accelerated parse/serialize when available
+# (websockets' send expects str, hence the decode on dumps)
+_loads = orjson.loads if orjson is not None else json.loads
+_dumps = (lambda obj: orjson.dumps(obj).decode()) if orjson is not None else json.dumps
+
 load_dotenv()
 
 class MarketDataStreamSecond:
     """
-    Market data stream that resubscribes every second to get initial orderbook snapshots.
-    This simulates second-by-second market data instead of tick-by-tick updates.
+    Market data stream that samples the orderbook once per second.
+
+    Holds a single persistent subscription and keeps the local OrderBook
+    current from the delta stream; a 1 Hz sampler task emits the events.
+    This replaces the old subscribe/unsubscribe-every-second design,
+    which paid two control messages per cycle plus a snapshot-wait and
+    needed duplicate detection to paper over re-sent snapshots.
     """
-    
-    def __init__(self, order_book: Optional[OrderBook] = None, 
-                symbol: str = "BTC/USD", 
+
+    def __init__(self, order_book: Optional[OrderBook] = None,
+                symbol: str = "BTC/USD",
                 verbose: bool = False,
                 record_orderbook: bool = False,
-                out_q: Optional[asyncio.Queue] = None):
+                out_q: Optional[asyncio.Queue] = None,
+                threaded_recv: bool = False):
         """
         Initialize the second-based market data stream.
-        
+
         Args:
             order_book: Optional OrderBook instance to update with incoming snapshots
             symbol: Trading symbol to subscribe to (default: "BTC/USD")
             verbose: If True, print messages (slows down processing)
+            threaded_recv: Run the blocking websockets.sync client on a
+                dedicated thread instead of the asyncio receive loop -
+                no coroutine machinery per frame, the OS does the wait.
+                Needs websockets >= 11 (the pinned 10.4 satisfies
+                alpaca-trade-api but predates websockets.sync); without
+                it the stream shuts down cleanly with an error logged
         """
         self.api_key = os.getenv("ALPACA_KEY")
         self.api_secret = os.getenv("ALPACA_SECRET")
         self.order_book = order_book
-        self.symbol = symbol
+        # Interned so the per-message symbol filter can short-circuit on
+        # pointer identity when the decoder returns an interned string
+        self.symbol = sys.intern(symbol)
         self.ws_url = "wss://stream.data.alpaca.markets/v1beta3/crypto/us"
         self.ws = None
         self.verbose = verbose
-        
+
         self.message_count = 0
         self.snapshot_count = 0
 
         self.running = False
-        self.snapshot_event = None  # Event to signal snapshot received
-        self.is_subscribed = False  # Track subscription state
-        self.last_snapshot_timestamp = None  # Track last processed snapshot
-        self.duplicate_detected = False  # Track if duplicate snapshot was detected
         self.out_q = out_q
+        self._time = None  # bound to the running loop's clock in connect()
 
         self.record_orderbook = record_orderbook
-        
+        self.threaded_recv = threaded_recv
+
+        # Serialized once at construction: reconnects resend these
+        # cached frames instead of re-encoding the same JSON
+        self._auth_frame = _dumps({
+            "action": "auth",
+            "key": self.api_key,
+            "secret": self.api_secret
+        })
+        self._subscribe_frame = _dumps({
+            "action": "subscribe",
+            "orderbooks": [self.symbol]
+        })
+
     async def connect(self):
-        """Connect to WebSocket and maintain connection"""
+        """Connect to WebSocket, subscribe once, and keep the local
+        book current while the sampler emits one event per second"""
+        if self.threaded_recv:
+            await self._connect_threaded()
+            return
         try:
             async with websockets.connect(
                 self.ws_url,
                 ping_interval=20,
                 ping_timeout=10,
-                max_size=10**7  # 10MB max message size
+                # Alpaca orderbook frames are small - a 1MB cap, a
+                # shallow receive queue, and an explicit write limit
+                # keep back-pressure bounded and surface a slow
+                # consumer quickly instead of buffering megabytes
+                max_size=2**20,
+                max_queue=32,
+                write_limit=2**16,
+                # Snapshot frames are small JSON - deflate costs more
+                # CPU than it saves, and skipping it also removes the
+                # decompress pass before each parse
+                compression=None
             ) as websocket:
                 self.ws = websocket
-                
-                # Authenticate
-                auth_message = {
-                    "action": "auth",
-                    "key": self.api_key,
-                    "secret": self.api_secret
-                }
-                await websocket.send(json.dumps(auth_message))
-                
-                message_task = asyncio.create_task(self.process_messages(websocket))
-                
-                # Start the periodic subscription loop
-                try:
-                    await self.subscription_loop(websocket)
-                finally:
-                    message_task.cancel()
+                self.running = True
+
+                # Cache the running loop's clock once: get_event_loop()
+                # per time-check re-resolves the loop (and is deprecated
+                # off the loop thread in 3.10+)
+                self._time = asyncio.get_running_loop().time
+
+                # Authenticate and subscribe once with the cached frames;
+                # the server keeps pushing deltas for the whole session
+                await websocket.send(self._auth_frame)
+                await websocket.send(self._subscribe_frame)
+
+                # Structured cleanup: when the receive loop returns (or
+                # raises) the group cancels the sampler atomically - no
+                # manual cancel/await-CancelledError dance
+                async with asyncio.TaskGroup() as tg:
+                    sampler_task = tg.create_task(self.sampler())
                     try:
-                        await message_task
-                    except asyncio.CancelledError:
-                        pass
-                    
+                        await self.process_messages(websocket)
+                    finally:
+                        self.running = False
+                        sampler_task.cancel()
+
         except Exception as e:
             print(f"Connection error: {e}", file=sys.stderr, flush=True)
             raise
-    
+
+    def _make_handler(self):
+        """Build the per-frame handler with hot lookups bound to locals:
+        each self.x in the frame loop is a LOAD_ATTR dict probe, and the
+        handler runs for every delta the feed pushes"""
+        loads = _loads
+        sym = self.symbol
+        book = self.order_book
+        # The fields are destructured here for routing, so hand them to
+        # the book's pre-validated entrypoint rather than having
+        # update() re-probe the same dict
+        update = book.update_fields if book is not None else None
+
+        def handle(message):
+            try:
+                # Fast JSON parsing (orjson accepts both str and bytes)
+                data = loads(message)
+            except ValueError:
+                return
+
+            messages = data if isinstance(data, list) else [data]
+
+            for msg in messages:
+                if not isinstance(msg, dict) or msg.get('T') != 'o':
+                    continue
+                if msg.get('S') != sym:
+                    continue
+
+                self.message_count += 1
+                reset = msg.get('r', False)
+                if reset:
+                    self.snapshot_count += 1
+
+                if update is not None:
+                    update(msg.get('t'), msg.get('b'), msg.get('a'), reset)
+
+        return handle
+
     async def process_messages(self, websocket):
         """
-        Background task to process all incoming messages.
-        Looks for snapshots and signals when found.
+        Receive loop: parse each frame and fold orderbook messages into
+        the local book. OrderBook.update handles both the initial
+        snapshot (r: true) and incremental deltas.
         """
-        try:
+        handle = self._make_handler()
+
+        # Newer websockets can hand frames over as raw bytes, skipping
+        # the per-frame UTF-8 decode and str allocation (both JSON
+        # parsers take bytes directly); older versions only offer the
+        # decoded-text iterator
+        if 'decode' in inspect.signature(websocket.recv).parameters:
+            try:
+                while True:
+                    handle(await websocket.recv(decode=False))
+            except websockets.exceptions.ConnectionClosedOK:
+                pass
+        else:
             async for message in websocket:
-                if self.is_subscribed:
-                    snapshot = await self.process_snapshot(message)
-                    if snapshot and self.snapshot_event and not self.snapshot_event.is_set():
-                        self.snapshot_event.set()
-        except asyncio.CancelledError:
-            raise
-        except Exception as e:
-            if self.verbose:
-                print(f"Error in message processing: {e}", file=sys.stderr, flush=True)
-    
-    async def subscription_loop(self, websocket):
+                handle(message)
+
+    async def _connect_threaded(self):
         """
-        Main loop that subscribes/unsubscribes
+        Blocking-recv variant: a dedicated thread runs the synchronous
+        websockets client and feeds raw frames into an asyncio.Queue,
+        so no coroutine runs per frame - the OS blocks in recv() and
+        the loop thread only wakes to parse and apply each frame.
         """
+        loop = asyncio.get_running_loop()
+        self._time = loop.time
         self.running = True
 
-        unsubscribe_message = {
-            "action": "unsubscribe",
-            "orderbooks": [self.symbol]
-        }
+        frame_q: asyncio.Queue = asyncio.Queue()
+        recv_thread = threading.Thread(
+            target=self._recv_thread, args=(loop, frame_q),
+            name="md_recv", daemon=True
+        )
+        recv_thread.start()
 
-        subscribe_message = {
-            "action": "subscribe",
-            "orderbooks": [self.symbol] # BTC/USD
-        }
-        
-        while self.running:
+        handle = self._make_handler()
+
+        async with asyncio.TaskGroup() as tg:
+            sampler_task = tg.create_task(self.sampler())
             try:
-                # Create event to track snapshot reception
-                self.snapshot_event = asyncio.Event()
-                self.is_subscribed = True  # Mark as subscribed
-                self.duplicate_detected = False  # Track if duplicate was detected
-
-                # SUBSCRIBE
-                await websocket.send(json.dumps(subscribe_message))
-                
-                start_time = asyncio.get_event_loop().time()
-                try:
-                    await asyncio.wait_for(self.snapshot_event.wait(), timeout=1.5)
-
-                    if self.duplicate_detected:
-                        # UN-SUBSCRIBE
-                        self.is_subscribed = False
-                        await websocket.send(json.dumps(unsubscribe_message))
-
-                        await asyncio.sleep(0.5)
-                        continue
-
-                    
-                    # UN-SUBSCRIBE
-                    self.is_subscribed = False
-                    await websocket.send(json.dumps(unsubscribe_message))
-                    
-
-                    elapsed = asyncio.get_event_loop().time() - start_time
-                    remaining_time = max(0, 1.5 - elapsed)
-                    if remaining_time > 0:
-                        await asyncio.sleep(remaining_time)
-                    
-                    continue  # Restart loop
-
-                except asyncio.TimeoutError:
-
-                    # unsubscribe
-                    self.is_subscribed = False
-                    await websocket.send(json.dumps(unsubscribe_message))
-                    continue
-                
-            except asyncio.CancelledError:
-                # Handle cancellation gracefully
-                self.is_subscribed = False
+                while self.running:
+                    message = await frame_q.get()
+                    if message is None:  # shutdown sentinel from the worker
+                        break
+                    handle(message)
+            finally:
                 self.running = False
-                raise
-            except Exception as e:
-                self.is_subscribed = False
-                if self.verbose:
-                    print(f"Error in subscription loop: {e}", file=sys.stderr, flush=True)
-                await asyncio.sleep(0.1)
-    
-    async def process_snapshot(self, message: str) -> Optional[dict]:
-        """
-        Process raw WebSocket message and return snapshot if found.
-        """
+                sampler_task.cancel()
+
+    def _recv_thread(self, loop, frame_q):
+        """Worker thread: blocking connect/recv, frames handed to the
+        loop thread via call_soon_threadsafe"""
         try:
-            data = json.loads(message)
-            
-            # Handle list of messages
-            messages = data if isinstance(data, list) else [data]
-            
-            for msg in messages:
-                # Check if it's an orderbook message with r: true
-                if (isinstance(msg, dict) and 
-                    msg.get('T') == 'o' and 
-                    msg.get('S') == self.symbol and 
-                    msg.get('r', False)):
-                    
-                    # Check for duplicate
-                    snapshot_timestamp = msg.get('t')
-                    if snapshot_timestamp == self.last_snapshot_timestamp:
-                        if self.verbose:
-                            print(f"[{datetime.now().strftime('%H:%M:%S.%f')}] Duplicate snapshot detected with timestamp {snapshot_timestamp}", flush=True)
-                        self.duplicate_detected = True
-                        if self.snapshot_event:
-                            self.snapshot_event.set()
-                        return None
-                    
-                    # Process valid snapshot
-                    self.last_snapshot_timestamp = snapshot_timestamp
-                    self.snapshot_count += 1
-                    self.message_count += 1
-                    
-                    if self.verbose:
-                        print(f"Received snapshot #{self.snapshot_count} at {msg.get('t', 'N/A')}", flush=True)
-
-                        # print(f"msg: {msg}", flush=True)
-                    
-                    if self.order_book is not None:
-
-                        # loop = asyncio.get_event_loop()
-                        # loop.run_in_executor(None, self.order_book.update, msg)
-
-                        self.order_book.update(msg) # TODO: potential issue here
-
-                        if self.verbose:
-                            self.order_book.print_orderbook()
-
-                        if self.record_orderbook:
-                            print(f"Recording orderbook to file", flush=True)
-                            self.order_book.record_orderbook(filename="order_book.json")
-
-                        if self.out_q is not None:
-                            event = Event(
-                                type=EventType.ORDERBOOK_UPDATE,
-                                payload=self.order_book,
-                                timestamp=msg.get('t')
-                            )
-                            await self.out_q.put(event)
-                    
-                    return msg
-                    
+            # Imported here, not at module top: the sync client needs
+            # websockets >= 11 and only this opt-in path requires it
+            from websockets.sync.client import connect as sync_connect
+            with sync_connect(
+                self.ws_url,
+                max_size=2**20,
+                compression=None
+            ) as ws:
+                ws.send(self._auth_frame)
+                ws.send(self._subscribe_frame)
+                while self.running:
+                    message = ws.recv()
+                    loop.call_soon_threadsafe(frame_q.put_nowait, message)
         except Exception as e:
-            if self.verbose:
-                print(f"Error parsing message: {e}", file=sys.stderr, flush=True)
-        
-        return None
-    
+            if self.running:
+                print(f"Receive thread error: {e}", file=sys.stderr, flush=True)
+        finally:
+            # Stop and wake the consumer - it parks on frame_q.get()
+            # and only rechecks self.running between frames, so an
+            # error here would otherwise leave it blocked forever
+            loop.call_soon_threadsafe(self.stop)
+            loop.call_soon_threadsafe(frame_q.put_nowait, None)
+
+    async def sampler(self):
+        """
+        Sample the live book once per second: print/record if asked and
+        emit an ORDERBOOK_UPDATE event downstream.
+        """
+        # Wait for the first message to populate the book
+        while self.running and self.order_book is not None \
+                and self.order_book.last_update_time is None:
+            await asyncio.sleep(0.1)
+
+        # Absolute deadlines so per-sample work doesn't accumulate as
+        # drift: each sleep targets the next whole-second boundary
+        # rather than "one second from now"
+        deadline = self._time()
+
+        while self.running:
+            if self.order_book is not None:
+                if self.verbose:
+                    self.order_book.print_orderbook()
+
+                if self.record_orderbook:
+                    self.order_book.record_orderbook(filename="order_book.json")
+
+                if self.out_q is not None:
+                    event = Event(
+                        type=EventType.ORDERBOOK_UPDATE,
+                        payload=self.order_book,
+                        timestamp=self.order_book.last_update_time
+                    )
+                    await self.out_q.put(event)
+
+            deadline += 1.0
+            now = self._time()
+            if deadline < now:
+                deadline = now  # fell behind - skip forward, don't burst
+            await asyncio.sleep(deadline - now)
+
     def start(self):
         """Start the async WebSocket stream"""
         try:
             asyncio.run(self.connect())
         except KeyboardInterrupt:
             if self.verbose:
-                print(f"\nProcessed {self.snapshot_count} snapshots", flush=True)
+                print(f"\nProcessed {self.message_count} messages "
+                      f"({self.snapshot_count} snapshots)", flush=True)
             self.running = False
-    
+        finally:
+            # Flush the recording writer on the way out - a Ctrl+C
+            # would otherwise kill the daemon thread with queued
+            # records unwritten and the file buffer unflushed
+            if self.record_orderbook and self.order_book is not None:
+                self.order_book.close_recording()
+
     def stop(self):
         """Stop the WebSocket stream"""
-        self.running = False
\ No newline at end of file
+        self.running = False
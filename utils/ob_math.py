@@ -0,0 +1,171 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to plain NumPy
+    njit = None
+
+
+def _weighted_imbalance(prices_b, sizes_b, prices_a, sizes_a, mid):
+    """
+    Proximity-weighted bid/ask volume reduction.
+
+    Each level is weighted by 1 - |price - mid| / mid so liquidity near
+    the mid counts more. Written as explicit loops so numba can compile
+    it to SIMD code; the arrays must be contiguous float64.
+
+    Returns:
+        (bid_weighted_volume, ask_weighted_volume)
+    """
+    inv = 1.0 / mid
+    b = 0.0
+    for i in range(prices_b.shape[0]):
+        b += sizes_b[i] * (1.0 - abs(prices_b[i] - mid) * inv)
+    a = 0.0
+    for i in range(prices_a.shape[0]):
+        a += sizes_a[i] * (1.0 - abs(prices_a[i] - mid) * inv)
+    return b, a
+
+
+def _weighted_imbalance_numpy(prices_b, sizes_b, prices_a, sizes_a, mid):
+    """NumPy fallback used when numba is not installed."""
+    inv = 1.0 / mid
+    b = np.einsum('i,i->', sizes_b, 1.0 - np.abs(prices_b - mid) * inv) if prices_b.size else 0.0
+    a = np.einsum('i,i->', sizes_a, 1.0 - np.abs(prices_a - mid) * inv) if prices_a.size else 0.0
+    return float(b), float(a)
+
+
+def _merge_levels(prices, sizes, out_prices, out_sizes):
+    """
+    Filter out empty levels and write the survivors contiguously into
+    the output rows. Written loop-style for numba (nogil so concurrent
+    replay readers do not serialize).
+
+    Returns:
+        Number of valid levels written
+    """
+    cap = out_prices.shape[0]
+    n = 0
+    for i in range(prices.shape[0]):
+        if prices[i] > 0.0 and sizes[i] > 0.0 and n < cap:
+            out_prices[n] = prices[i]
+            out_sizes[n] = sizes[i]
+            n += 1
+    return n
+
+
+def _apply_updates(px, sz, n, upd_px, upd_sz):
+    """
+    Apply a batch of (key, size) level updates to one sorted book side
+    in place: binary search per key, then a shift for insert/delete.
+    Bid callers pass negated prices so both sides sort ascending.
+    A size of 0 removes the level; inserting into a full array evicts
+    the worst (last) level. Loop-style so numba compiles it to straight
+    machine code with no interpreter dispatch per level.
+
+    Returns:
+        (new live-level count, delta to the side's total size)
+    """
+    cap = px.shape[0]
+    total_delta = 0.0
+    for k in range(upd_px.shape[0]):
+        key = upd_px[k]
+        size = upd_sz[k]
+
+        lo = 0
+        hi = n
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if px[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        idx = lo
+
+        if idx < n and px[idx] == key:
+            if size == 0.0:
+                total_delta -= sz[idx]
+                for j in range(idx, n - 1):
+                    px[j] = px[j + 1]
+                    sz[j] = sz[j + 1]
+                n -= 1
+            else:
+                total_delta += size - sz[idx]
+                sz[idx] = size
+        elif size != 0.0 and idx < cap:
+            if n == cap:
+                total_delta -= sz[n - 1]
+                n -= 1
+            for j in range(n, idx, -1):
+                px[j] = px[j - 1]
+                sz[j] = sz[j - 1]
+            px[idx] = key
+            sz[idx] = size
+            total_delta += size
+            n += 1
+    return n, total_delta
+
+
+def _apply_updates_numpy(px, sz, n, upd_px, upd_sz):
+    """
+    NumPy fallback for apply_updates: instead of N binary searches and
+    shifts at interpreter speed, do one vectorized merge pass - drop
+    the levels being overridden, append the non-zero updates, and
+    re-sort the survivors in a single C-level sweep.
+
+    Matches the loop kernel exactly while the side stays within
+    capacity; under overflow it evicts after the merge (keeping the
+    best cap levels overall) where the loop kernel evicts as it goes.
+    The arrays carry headroom beyond max_levels, so overflow only
+    happens transiently between trims.
+    """
+    m = upd_px.shape[0]
+    if m == 0:
+        return n, 0.0
+    cap = px.shape[0]
+    old_total = float(sz[:n].sum()) if n else 0.0
+
+    # Sort updates by key; among duplicates the last occurrence wins
+    order = np.argsort(upd_px, kind='stable')
+    keys = upd_px[order]
+    vals = upd_sz[order]
+    last = np.ones(m, dtype=bool)
+    last[:-1] = keys[1:] != keys[:-1]
+    keys = keys[last]
+    vals = vals[last]
+
+    # Existing levels whose key appears in the update batch are
+    # superseded (either replaced or deleted)
+    idx = np.searchsorted(keys, px[:n])
+    idx_c = np.minimum(idx, keys.shape[0] - 1)
+    overridden = keys[idx_c] == px[:n]
+    keep_px = px[:n][~overridden]
+    keep_sz = sz[:n][~overridden]
+
+    live = vals > 0.0
+    new_px = np.concatenate((keep_px, keys[live]))
+    new_sz = np.concatenate((keep_sz, vals[live]))
+    order = np.argsort(new_px, kind='stable')
+    n = min(order.shape[0], cap)  # worst levels fall off the end
+    px[:n] = new_px[order[:n]]
+    sz[:n] = new_sz[order[:n]]
+    return n, (float(sz[:n].sum()) if n else 0.0) - old_total
+
+
+def _merge_levels_numpy(prices, sizes, out_prices, out_sizes):
+    """NumPy fallback used when numba is not installed."""
+    mask = (prices > 0.0) & (sizes > 0.0)
+    n = min(int(mask.sum()), out_prices.shape[0])
+    out_prices[:n] = prices[mask][:n]
+    out_sizes[:n] = sizes[mask][:n]
+    return n
+
+
+if njit is not None:
+    weighted_imbalance = njit(cache=True, fastmath=True, boundscheck=False)(_weighted_imbalance)
+    merge_levels = njit(cache=True, nogil=True)(_merge_levels)
+    apply_updates = njit(cache=True, nogil=True)(_apply_updates)
+else:
+    weighted_imbalance = _weighted_imbalance_numpy
+    merge_levels = _merge_levels_numpy
+    apply_updates = _apply_updates_numpy
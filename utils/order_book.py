@@ -1,7 +1,16 @@
-from sortedcontainers import SortedDict
 from typing import Optional, List, Tuple, Dict
 
 import json
+import queue
+import threading
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to stdlib json
+    orjson = None
+
+from utils.ob_math import apply_updates
 
 
 class OrderBook:
@@ -9,128 +18,190 @@ class OrderBook:
     Maintains a local order book for a single symbol.
     Updates based on incoming WebSocket messages from Alpaca.
     Maintains configurable depth (default 10 levels) above and below mid price.
+
+    Levels live in flat sorted numpy arrays (struct-of-arrays: one
+    price array, one size array per side) instead of a tree container:
+    with only ~max_levels entries that matter, binary search plus a
+    small slice shift beats per-level Python object churn, and the hot
+    data for one side fits in a couple of cache lines.
     """
-    
+
+    # No per-instance __dict__: every attribute access on the hot path
+    # is a fixed-offset load and the instance footprint shrinks
+    __slots__ = (
+        'symbol', 'max_levels', 'trim_frequency', 'update_count', 'full',
+        '_cap', '_bid_px', '_bid_sz', '_ask_px', '_ask_sz',
+        'n_bids', 'n_asks', 'last_update_time',
+        '_best_bid', '_best_ask', '_best_bid_sz', '_best_ask_sz',
+        'total_bid_size', 'total_ask_size',
+        '_bids_buf', '_asks_buf', '_bids_back', '_asks_back',
+        '_bids_buf_n', '_asks_buf_n',
+        '_bids_cache', '_asks_cache',
+        '_record_path', '_rec_q', '_rec_thread',
+    )
+
     def __init__(self, symbol: str, max_levels: int = 10, trim_frequency: int = 100, full: bool = False):
         """
         Initialize an order book for a given symbol.
-        
+
         Args:
             symbol: Trading symbol (e.g., "BTC/USD")
             max_levels: Maximum number of price levels to maintain above/below mid price
         """
         self.symbol = symbol
         self.max_levels = max_levels
+        # Kept for caller compatibility; trimming is now triggered by
+        # side size (see _finish_update), not an update-count period
         self.trim_frequency = trim_frequency
         self.update_count = 0
         self.full = full
-        
-        # Bids: use negated prices as keys for descending order (highest first)
-        # Values are sizes at each price level
-        self.bids = SortedDict()
-        
-        # Asks: use regular prices as keys for ascending order (lowest first)
-        # Values are sizes at each price level
-        self.asks = SortedDict()
-        
+
+        # Sorted level arrays. Bid prices are stored negated and
+        # ascending (the same trick the old SortedDict used) so both
+        # sides share one searchsorted/insert code path and index 0 is
+        # always the best level. Capacity has headroom beyond
+        # max_levels so bursts insert before trimming, not instead of it.
+        self._cap = max_levels + 32
+        self._bid_px = np.empty(self._cap, dtype=np.float64)  # negated
+        self._bid_sz = np.empty(self._cap, dtype=np.float64)
+        self._ask_px = np.empty(self._cap, dtype=np.float64)
+        self._ask_sz = np.empty(self._cap, dtype=np.float64)
+        self.n_bids = 0
+        self.n_asks = 0
+
         self.last_update_time: Optional[str] = None
-    
+
+        # Cached top-of-book, refreshed on every update() so the
+        # getters are plain attribute returns (get_spread/get_mid_price
+        # call them several times per tick)
+        self._best_bid: Optional[float] = None
+        self._best_ask: Optional[float] = None
+        self._best_bid_sz: Optional[float] = None
+        self._best_ask_sz: Optional[float] = None
+
+        # Running size totals maintained on every mutation so strategies
+        # can get a cheap unweighted imbalance without scanning the book
+        self.total_bid_size = 0.0
+        self.total_ask_size = 0.0
+
+        # Double-buffered (price, size) tables so strategies get
+        # contiguous float64 views without per-tick allocations.
+        # Readers take views of the front buffers; writers fill the back
+        # buffer and publish it with a single reference swap (atomic
+        # under the GIL), so a view handed out before the swap never
+        # sees a half-written frame. A non-negative count means the
+        # front buffer is current and the view can be returned without
+        # rescanning the book.
+        self._bids_buf = np.empty((max_levels, 2), dtype=np.float64)
+        self._asks_buf = np.empty((max_levels, 2), dtype=np.float64)
+        self._bids_back = np.empty((max_levels, 2), dtype=np.float64)
+        self._asks_back = np.empty((max_levels, 2), dtype=np.float64)
+        self._bids_buf_n = -1
+        self._asks_buf_n = -1
+
+        # Memoized get_bids/get_asks results (immutable tuples), rebuilt
+        # at most once per update however many consumers ask per tick
+        self._bids_cache: Optional[Tuple[Tuple[float, float], ...]] = None
+        self._asks_cache: Optional[Tuple[Tuple[float, float], ...]] = None
+
+        # Append-mode NDJSON recording: one O(1) append per record
+        # instead of a read-modify-rewrite of the whole file.
+        # Serialization and the write itself happen on a background
+        # thread fed by _rec_q, so the update path never blocks on a
+        # disk syscall.
+        self._record_path: Optional[str] = None
+        self._rec_q: Optional[queue.SimpleQueue] = None
+        self._rec_thread: Optional[threading.Thread] = None
+
     def _update_bids(self, bid_updates: List[Dict[str, float]]) -> None:
         """
         Update bid levels from incoming message.
-        
+
+        The dict payload is unpacked into two small arrays once, then
+        the whole batch runs through the compiled apply_updates kernel
+        (negated prices keep the array ascending with best first).
+
         Args:
             bid_updates: List of dicts with 'p' (price) and 's' (size) keys
         """
-        for update in bid_updates:
-            price = update['p']
-            size = update['s']
-            
-            # Use negated price as key for descending order
-            negated_price = -price
-            
-            if size == 0:
-                # Remove the price level
-                if negated_price in self.bids:
-                    del self.bids[negated_price]
-            else:
-                # Add or update the price level
-                self.bids[negated_price] = size
-    
+        m = len(bid_updates)
+        upd_px = np.fromiter((-u['p'] for u in bid_updates),
+                             dtype=np.float64, count=m)
+        upd_sz = np.fromiter((u['s'] for u in bid_updates),
+                             dtype=np.float64, count=m)
+        self.n_bids, delta = apply_updates(
+            self._bid_px, self._bid_sz, self.n_bids, upd_px, upd_sz)
+        self.total_bid_size += delta
+
     def _update_asks(self, ask_updates: List[Dict[str, float]]) -> None:
         """
         Update ask levels from incoming message.
-        
+
         Args:
             ask_updates: List of dicts with 'p' (price) and 's' (size) keys
         """
-        for update in ask_updates:
-            price = update['p']
-            size = update['s']
-            
-            if size == 0:
-                # Remove the price level
-                if price in self.asks:
-                    del self.asks[price]
-            else:
-                # Add or update the price level
-                self.asks[price] = size
-    
+        m = len(ask_updates)
+        upd_px = np.fromiter((u['p'] for u in ask_updates),
+                             dtype=np.float64, count=m)
+        upd_sz = np.fromiter((u['s'] for u in ask_updates),
+                             dtype=np.float64, count=m)
+        self.n_asks, delta = apply_updates(
+            self._ask_px, self._ask_sz, self.n_asks, upd_px, upd_sz)
+        self.total_ask_size += delta
+
     def _reset_book(self, bids: List[Dict[str, float]], asks: List[Dict[str, float]]) -> None:
         """
-        Reset the entire order book with new data.
+        Reset the order book to new snapshot data.
         Called when 'r': true in the message.
-        
+
+        Vectorized rebuild: unpack each side into arrays once, mask out
+        dead levels branchlessly, argsort, and bulk-copy into the live
+        region - three C-level passes instead of a Python-level loop
+        with a branch per level.
+
         Args:
             bids: Complete list of bid levels
             asks: Complete list of ask levels
         """
-        self.bids.clear()
-        self.asks.clear()
-        
-        # Rebuild bids
-        for bid in bids:
-            if bid['s'] > 0:  # Only add non-zero sizes
-                negated_price = -bid['p']
-                self.bids[negated_price] = bid['s']
-        
-        # Rebuild asks
-        for ask in asks:
-            if ask['s'] > 0:  # Only add non-zero sizes
-                self.asks[ask['p']] = ask['s']
-    
+        self.n_bids, self.total_bid_size = self._reset_side(
+            bids, True, self._bid_px, self._bid_sz)
+        self.n_asks, self.total_ask_size = self._reset_side(
+            asks, False, self._ask_px, self._ask_sz)
+
+    def _reset_side(self, levels: List[Dict[str, float]], negate: bool,
+                    px_out: np.ndarray, sz_out: np.ndarray) -> Tuple[int, float]:
+        """Rebuild one side's arrays from snapshot levels; returns the
+        live count and total size. Bids pass negate=True so their keys
+        sort ascending like the asks."""
+        m = len(levels)
+        if negate:
+            px = np.fromiter((-u['p'] for u in levels), dtype=np.float64, count=m)
+        else:
+            px = np.fromiter((u['p'] for u in levels), dtype=np.float64, count=m)
+        sz = np.fromiter((u['s'] for u in levels), dtype=np.float64, count=m)
+
+        live = sz > 0.0
+        px = px[live]
+        sz = sz[live]
+        order = np.argsort(px, kind='stable')[:self._cap]
+        n = order.shape[0]
+        px_out[:n] = px[order]
+        sz_out[:n] = sz[order]
+        return n, (float(sz_out[:n].sum()) if n else 0.0)
+
     def _trim_to_max_levels(self) -> None:
         """
-        Trim the order book to maintain only max_levels above and below mid price.
+        Trim the order book to maintain only max_levels per side.
+        With sorted arrays this is just clamping the live count and
+        subtracting the dropped tail from the running totals.
         """
-        if not self.bids or not self.asks:
-            return
-        
-        # Fast path: if we have fewer levels than max, no trimming needed
-        if len(self.bids) <= self.max_levels and len(self.asks) <= self.max_levels:
-            return
-        
-        # Get best prices (already cached in SortedDict)
-        best_bid_price = -self.bids.keys()[0] if self.bids else None
-        best_ask_price = self.asks.keys()[0] if self.asks else None
-        
-        if best_bid_price is None or best_ask_price is None:
-            return
-        
-        # Trim bids: keep only top max_levels (highest prices)
-        if len(self.bids) > self.max_levels:
-            # SortedDict is already sorted, just keep first max_levels
-            keys_to_remove = list(self.bids.keys())[self.max_levels:]
-            for key in keys_to_remove:
-                del self.bids[key]
-        
-        # Trim asks: keep only top max_levels (lowest prices)
-        if len(self.asks) > self.max_levels:
-            # SortedDict is already sorted, just keep first max_levels
-            keys_to_remove = list(self.asks.keys())[self.max_levels:]
-            for key in keys_to_remove:
-                del self.asks[key]
-    
+        if self.n_bids > self.max_levels:
+            self.total_bid_size -= float(self._bid_sz[self.max_levels:self.n_bids].sum())
+            self.n_bids = self.max_levels
+        if self.n_asks > self.max_levels:
+            self.total_ask_size -= float(self._ask_sz[self.max_levels:self.n_asks].sum())
+            self.n_asks = self.max_levels
+
     def _get_price_increment(self) -> float:
         """
         Estimate price increment based on current best bid/ask.
@@ -139,18 +210,18 @@ class OrderBook:
         """
         best_bid = self.get_best_bid_price()
         best_ask = self.get_best_ask_price()
-        
+
         if best_bid and best_ask:
             spread = best_ask - best_bid
             # Use 1% of spread as increment, with minimum of 0.01
             return max(0.01, spread * 0.01)
-        
+
         return 1.0  # Default fallback
-    
+
     def update(self, message: Dict) -> None:
         """
         Update the order book based on an incoming WebSocket message.
-        
+
         Args:
             message: Dictionary containing order book update with keys:
                     - 'T': message type (should be 'o')
@@ -163,153 +234,252 @@ class OrderBook:
         # Validate that message is a dictionary
         if not isinstance(message, dict):
             return
-        
+
         # Validate message type
         if message.get('T') != 'o':
             return
-        
+
         # Validate symbol matches
         if message.get('S') != self.symbol:
             return
-        
-        # Update timestamp
-        self.last_update_time = message.get('t')
-        
-        # Handle reset
-        if message.get('r', False):
-            self._reset_book(
-                message.get('b', []),
-                message.get('a', [])
-            )
+
+        self.update_fields(message.get('t'),
+                           message.get('b'), message.get('a'),
+                           message.get('r', False))
+
+    def update_fields(self, t, bids, asks, reset: bool = False) -> None:
+        """
+        Pre-validated fast path: apply already-destructured message
+        fields. The websocket handlers check 'T' and 'S' while routing
+        anyway, so calling this directly avoids repeating those guards
+        and the per-field dict probes inside the book.
+
+        Args:
+            t: Update timestamp
+            bids, asks: Level-update lists ('p'/'s' dicts); falsy to skip
+            reset: Treat the lists as a full snapshot
+        """
+        self.last_update_time = t
+
+        if reset:
+            self._reset_book(bids or [], asks or [])
         else:
-            # Handle incremental updates
-            if 'b' in message and message['b']:
-                self._update_bids(message['b'])
-            
-            if 'a' in message and message['a']:
-                self._update_asks(message['a'])
-        
-        # Only trim periodically for speed (trimming is expensive)
+            if bids:
+                self._update_bids(bids)
+            if asks:
+                self._update_asks(asks)
+
+        self._finish_update()
+
+    def update_arrays(self, ts, bid_arr: Optional[np.ndarray],
+                      ask_arr: Optional[np.ndarray], reset: bool = False) -> None:
+        """
+        Array-native entrypoint: apply pre-parsed (n, 2) [price, size]
+        update arrays straight through the kernels, skipping the
+        per-level dict lookups of the message path. For callers that
+        decode frames into arrays at the websocket boundary.
+
+        Args:
+            ts: Update timestamp
+            bid_arr, ask_arr: float64 arrays of [price, size] rows
+                              (size 0 removes the level); None to skip
+            reset: Treat the arrays as a full snapshot
+        """
+        self.last_update_time = ts
+
+        if reset:
+            self.n_bids = self.n_asks = 0
+            self.total_bid_size = self.total_ask_size = 0.0
+
+        if bid_arr is not None and len(bid_arr):
+            self.n_bids, delta = apply_updates(
+                self._bid_px, self._bid_sz, self.n_bids,
+                -np.ascontiguousarray(bid_arr[:, 0]),
+                np.ascontiguousarray(bid_arr[:, 1]))
+            self.total_bid_size += delta
+
+        if ask_arr is not None and len(ask_arr):
+            self.n_asks, delta = apply_updates(
+                self._ask_px, self._ask_sz, self.n_asks,
+                np.ascontiguousarray(ask_arr[:, 0]),
+                np.ascontiguousarray(ask_arr[:, 1]))
+            self.total_ask_size += delta
+
+        self._finish_update()
+
+    def _finish_update(self) -> None:
+        """Refresh cached top-of-book, invalidate the published view
+        buffers, and run the periodic trim. Shared tail of both
+        update entrypoints."""
+        if self.n_bids:
+            self._best_bid = -self._bid_px[0]
+            self._best_bid_sz = self._bid_sz[0]
+        else:
+            self._best_bid = None
+            self._best_bid_sz = None
+        if self.n_asks:
+            self._best_ask = self._ask_px[0]
+            self._best_ask_sz = self._ask_sz[0]
+        else:
+            self._best_ask = None
+            self._best_ask_sz = None
+
+        # Incremental updates invalidate any prefilled view buffers and
+        # the memoized level tuples
+        self._bids_buf_n = -1
+        self._asks_buf_n = -1
+        self._bids_cache = None
+        self._asks_cache = None
+
+        # Trim only when a side has actually outgrown its bound: the
+        # steady state pays two integer compares instead of a modulo
+        # plus an unconditional trim every N updates
         self.update_count += 1
-        if self.update_count % self.trim_frequency == 0:
+        if self.n_bids > 2 * self.max_levels or self.n_asks > 2 * self.max_levels:
             self._trim_to_max_levels()
-    
+
     def get_best_bid_price(self) -> Optional[float]:
         """Get the best (highest) bid price."""
-        if not self.bids:
-            return None
-        # Last key in bids (since keys are negated, last = highest price)
-        return -self.bids.keys()[0]
-    
+        return self._best_bid
+
     def get_best_bid_size(self) -> Optional[float]:
         """Get the size at the best bid price."""
-        if not self.bids:
-            return None
-        return self.bids.values()[0]
-    
+        return self._best_bid_sz
+
     def get_best_ask_price(self) -> Optional[float]:
         """Get the best (lowest) ask price."""
-        if not self.asks:
-            return None
-        return self.asks.keys()[0]
-    
+        return self._best_ask
+
     def get_best_ask_size(self) -> Optional[float]:
         """Get the size at the best ask price."""
-        if not self.asks:
-            return None
-        return self.asks.values()[0]
-    
+        return self._best_ask_sz
+
     def get_spread(self) -> Optional[float]:
         """Get the bid-ask spread."""
         best_bid = self.get_best_bid_price()
         best_ask = self.get_best_ask_price()
-        
+
         if best_bid is None or best_ask is None:
             return None
-        
+
         return best_ask - best_bid
-    
+
     def get_mid_price(self) -> Optional[float]:
         """Get the mid price (average of best bid and ask)."""
         best_bid = self.get_best_bid_price()
         best_ask = self.get_best_ask_price()
-        
+
         if best_bid is None or best_ask is None:
             return None
-        
+
         return (best_bid + best_ask) / 2
-    
-    def get_bids(self, max_levels: Optional[int] = None) -> List[Tuple[float, float]]:
+
+    def publish_bids(self, n: int) -> None:
+        """Swap the filled back bid buffer to the front. The old front
+        stays intact for any reader still holding a view of it."""
+        self._bids_buf, self._bids_back = self._bids_back, self._bids_buf
+        self._bids_buf_n = n
+
+    def publish_asks(self, n: int) -> None:
+        """Swap the filled back ask buffer to the front."""
+        self._asks_buf, self._asks_back = self._asks_back, self._asks_buf
+        self._asks_buf_n = n
+
+    def bids_view(self) -> np.ndarray:
+        """
+        Get the top bid levels as an (N, 2) float64 array view of
+        [price, size] rows, best bid first. The view is of the current
+        front buffer - grab it once per tick rather than holding it
+        across updates.
+        """
+        if self._bids_buf_n >= 0:
+            return self._bids_buf[:self._bids_buf_n]
+        n = min(self.n_bids, self.max_levels)
+        buf = self._bids_back
+        np.negative(self._bid_px[:n], out=buf[:n, 0])
+        buf[:n, 1] = self._bid_sz[:n]
+        self.publish_bids(n)
+        return self._bids_buf[:n]
+
+    def asks_view(self) -> np.ndarray:
         """
-        Get bid levels as list of (price, size) tuples, sorted lowest to highest.
-        
+        Get the top ask levels as an (N, 2) float64 array view of
+        [price, size] rows, best ask first. Same front-buffer caveat
+        as bids_view().
+        """
+        if self._asks_buf_n >= 0:
+            return self._asks_buf[:self._asks_buf_n]
+        n = min(self.n_asks, self.max_levels)
+        buf = self._asks_back
+        buf[:n, 0] = self._ask_px[:n]
+        buf[:n, 1] = self._ask_sz[:n]
+        self.publish_asks(n)
+        return self._asks_buf[:n]
+
+    def get_bids(self, max_levels: Optional[int] = None) -> Tuple[Tuple[float, float], ...]:
+        """
+        Get bid levels as (price, size) tuples, best bid first.
+
+        The full side is built once per update and memoized; repeated
+        calls (strategy, logger, display) share the same immutable
+        tuple, so a limit is just a slice.
+
         Args:
             max_levels: Optional limit on number of levels to return
         """
-        if max_levels is None:
-            max_levels = len(self.bids)
-        
-        result = []
-        all_negated_prices = list(self.bids.keys())
-        
-        for negated_price in all_negated_prices[:max_levels]:
-            actual_price = -negated_price
-            size = self.bids[negated_price]
-            result.append((actual_price, size))
-        
-        return result
-    
-    def get_asks(self, max_levels: Optional[int] = None) -> List[Tuple[float, float]]:
+        cache = self._bids_cache
+        if cache is None:
+            cache = tuple((-self._bid_px[i], self._bid_sz[i])
+                          for i in range(self.n_bids))
+            self._bids_cache = cache
+        if max_levels is None or max_levels >= len(cache):
+            return cache
+        return cache[:max_levels]
+
+    def get_asks(self, max_levels: Optional[int] = None) -> Tuple[Tuple[float, float], ...]:
         """
-        Get ask levels as list of (price, size) tuples, sorted highest to lowest.
-        
+        Get ask levels as (price, size) tuples, highest of the lowest-N
+        asks first (matches the original ordering). Memoized like
+        get_bids; limiting takes the tail since the tuple is stored
+        highest-first.
+
         Args:
             max_levels: Optional limit on number of levels to return
         """
-        if max_levels is None:
-            max_levels = len(self.asks)
-        
-        result = []
-
-        all_prices = list(self.asks.keys())[:max_levels]  # Get lowest N asks
-    
-        for price in reversed(all_prices):
-            size = self.asks[price]
-            result.append((price, size))
-        
-        return result
-
-        # for price in list(self.asks.keys())[:max_levels]:
-        #     size = self.asks[price]
-        #     result.append((price, size))
-        
-        # return result
-    
+        cache = self._asks_cache
+        if cache is None:
+            cache = tuple((self._ask_px[i], self._ask_sz[i])
+                          for i in range(self.n_asks - 1, -1, -1))
+            self._asks_cache = cache
+        if max_levels is None or max_levels >= len(cache):
+            return cache
+        return cache[len(cache) - max_levels:]
+
     def __repr__(self) -> str:
         """String representation of the order book."""
         best_bid = self.get_best_bid_price()
         best_ask = self.get_best_ask_price()
         spread = self.get_spread()
-        
+
         return (f"OrderBook(symbol={self.symbol}, "
                 f"best_bid={best_bid}, best_ask={best_ask}, "
-                f"spread={spread}, bid_levels={len(self.bids)}, "
-                f"ask_levels={len(self.asks)})")
+                f"spread={spread}, bid_levels={self.n_bids}, "
+                f"ask_levels={self.n_asks})")
 
     def print_orderbook(self, num_levels: Optional[int] = None) -> None:
         """
         Print a formatted visualization of the order book.
         Shows asks above, spread separator, and bids below in a 2-column table.
-        
+
         Args:
             num_levels: Number of levels to display on each side (default: all available)
         """
         if num_levels is None:
-            num_levels = min(len(self.bids), len(self.asks), self.max_levels)
-        
+            num_levels = min(self.n_bids, self.n_asks, self.max_levels)
+
         bids = self.get_bids(num_levels)
         asks = self.get_asks(num_levels)
-        
+
         best_bid = self.get_best_bid_price()
         best_ask = self.get_best_ask_price()
         best_bid_size = self.get_best_bid_size()
@@ -336,33 +506,40 @@ class OrderBook:
                 print(f"Bid: {bid}")
         print(f"================================================")
         print("\n")
-    
+
     def record_orderbook(self, num_levels: int = 10, filename: str = "order_book.json") -> None:
         """
-        Record the order book to a JSON file.
-        Appends to an array in the file, or creates a new array if file doesn't exist.
-        
+        Record the order book as NDJSON: one record appended per call,
+        so I/O per record is O(1) rather than re-reading and rewriting
+        the whole file each time. OrderBookSnapshotReader reads both
+        this format and the legacy JSON-array files.
+
         Args:
             num_levels: Number of bid/ask levels to record (default: 10)
             filename: Output filename (default: "order_book.json")
         """
         if not self.last_update_time:
             return  # Skip if no timestamp
-        
-        # Get bids (highest to lowest) - need to reverse current get_bids() output
-        bids_list = self.get_bids(num_levels)
-        bids_list.reverse()  # Reverse to get highest first
-        
-        # Get asks (lowest to highest) - need to reverse current get_asks() output  
-        asks_list = self.get_asks(num_levels)
-        asks_list.reverse()  # Reverse to get lowest first
-        
-        # Format bids as list of dicts
-        bids_data = [{"price": float(price), "size": float(size)} for price, size in bids_list]
-        
-        # Format asks as list of dicts
-        asks_data = [{"price": float(price), "size": float(size)} for price, size in asks_list]
-        
+
+        # Build the [price, size] pairs straight from the level arrays
+        # in recorded order (both sides ascending), skipping the getter
+        # tuples and the reversal pass. Pairs rather than per-level
+        # dicts: no small-dict allocation and arrays serialize faster
+        # than objects.
+        # No float() casts: the values are already float64 scalars and
+        # both serializers handle them as-is (orjson via the numpy
+        # option in the writer, stdlib json because np.float64
+        # subclasses float)
+        bid_px, bid_sz = self._bid_px, self._bid_sz
+        n_b = min(self.n_bids, num_levels)
+        bids_data = [[-bid_px[i], bid_sz[i]]
+                     for i in range(n_b - 1, -1, -1)]
+
+        ask_px, ask_sz = self._ask_px, self._ask_sz
+        n_a = min(self.n_asks, num_levels)
+        asks_data = [[ask_px[i], ask_sz[i]]
+                     for i in range(n_a)]
+
         # Create JSON object
         orderbook_record = {
             "asset": self.symbol,
@@ -372,17 +549,69 @@ class OrderBook:
                 "asks": asks_data
             }
         }
-        
-        # Read existing data or create new array
+
+        if self._rec_thread is None or self._record_path != filename:
+            self.close_recording()
+            self._record_path = filename
+            self._rec_q = queue.SimpleQueue()
+            self._rec_thread = threading.Thread(
+                target=self._record_writer, args=(filename, self._rec_q),
+                name="ob_record", daemon=True
+            )
+            self._rec_thread.start()
+
+        # Hand the record to the writer thread - the hot path pays one
+        # queue put, not a serialize + disk write
+        self._rec_q.put(orderbook_record)
+
+    @staticmethod
+    def _migrate_legacy_array(filename: str) -> None:
+        """Appending NDJSON lines after a legacy JSON-array recording
+        would leave a file neither format can parse, so rewrite such a
+        file as NDJSON once before the first append (atomically, via a
+        temp file). An unparseable array file is moved aside to .bak
+        rather than appended to."""
+        import os
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = []
-        
-        # Append new record
-        data.append(orderbook_record)
-        
-        # Write back to file
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
\ No newline at end of file
+            with open(filename, 'rb') as fp:
+                if fp.read(1) != b'[':
+                    return  # empty or already NDJSON
+                fp.seek(0)
+                records = json.loads(fp.read())
+        except FileNotFoundError:
+            return
+        except ValueError:
+            backup = filename + '.bak'
+            os.replace(filename, backup)
+            print(f"Warning: {filename} is not valid JSON - moved to {backup}, recording to a fresh file")
+            return
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as fp:
+            for rec in records:
+                fp.write(json.dumps(rec).encode() + b'\n')
+        os.replace(tmp, filename)
+
+    @staticmethod
+    def _record_writer(filename: str, rec_q: queue.SimpleQueue) -> None:
+        """Writer thread: serialize and append records until the None
+        sentinel arrives."""
+        OrderBook._migrate_legacy_array(filename)
+        with open(filename, 'ab') as fp:
+            while True:
+                rec = rec_q.get()
+                if rec is None:
+                    return
+                if orjson is not None:
+                    # Records carry raw np.float64 level values
+                    fp.write(orjson.dumps(rec, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n')
+                else:
+                    fp.write(json.dumps(rec).encode() + b'\n')
+
+    def close_recording(self) -> None:
+        """Stop the recording writer thread, flushing pending records."""
+        if self._rec_thread is not None:
+            self._rec_q.put(None)
+            self._rec_thread.join()
+            self._rec_thread = None
+            self._rec_q = None
+            self._record_path = None
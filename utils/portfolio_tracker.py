@@ -4,6 +4,8 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import matplotlib.pyplot as plt
 
+from utils.pt_math import apply_signed, apply_trades, metrics_core
+
 
 class Trade:
     """Represents a single trade execution"""
@@ -67,22 +69,107 @@ class PortfolioTracker:
             commission_rate: Commission rate as decimal (e.g., 0.001 for 0.1%)
         """
         self.initial_cash = initial_cash
-        self.cash = initial_cash
+        # Reciprocal cached once: the per-snapshot return calculation
+        # multiplies instead of dividing
+        self._initial_cash_inv = 1.0 / initial_cash
+        # Cash and realized PnL live in length-1 arrays so the compiled
+        # fill kernels can mutate them in place; the public attributes
+        # are properties over these cells
+        self._cash = np.array([initial_cash], dtype=np.float64)
+        self._realized = np.zeros(1, dtype=np.float64)
         self.commission_rate = commission_rate
-        
-        # Current positions: {symbol: {'quantity': float, 'avg_price': float}}
-        self.positions: Dict[str, Dict] = {}
-        
-        # Historical data
-        self.trades: List[Trade] = []
-        self.portfolio_snapshots: List[Dict] = []
-        self.position_snapshots: List[PositionSnapshot] = []
+
+        # Positions as struct-of-arrays: parallel quantity/avg-price
+        # columns indexed by a symbol -> slot dict, so mark-to-market
+        # math runs as whole-array numpy ops instead of a per-symbol
+        # Python loop. A flattened position keeps its slot and mapping
+        # with _active cleared - strategies that repeatedly flatten and
+        # re-enter the same symbol never touch the dict again.
+        self._sym_idx: Dict[str, int] = {}
+        self._idx_to_sym: List[str] = []
+        self._pos_cap = 16
+        self._qty = np.zeros(self._pos_cap, dtype=np.float64)
+        self._avg = np.zeros(self._pos_cap, dtype=np.float64)
+        self._active = np.zeros(self._pos_cap, dtype=bool)
+
+        # Trade history as preallocated columns (doubled on overflow):
+        # one array store per fill instead of a Trade object, and
+        # get_trades_df passes the columns to pandas directly
+        self._trade_cap = 1024
+        self._trade_ts = np.empty(self._trade_cap, dtype='datetime64[ns]')
+        self._trade_sym = np.empty(self._trade_cap, dtype=object)
+        self._trade_action = np.empty(self._trade_cap, dtype=np.uint8)
+        self._trade_qty = np.empty(self._trade_cap, dtype=np.float64)
+        self._trade_price = np.empty(self._trade_cap, dtype=np.float64)
+        self._trade_comm = np.empty(self._trade_cap, dtype=np.float64)
+        self._n_trades = 0
+
+        # Portfolio snapshots as preallocated columns, same scheme as
+        # the trade buffers: one array store per field per tick, and
+        # get_portfolio_df hands the slices straight to pandas
+        self._snap_cap = 1024
+        self._snap_ts = np.empty(self._snap_cap, dtype='datetime64[ns]')
+        self._snap_cash = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_pos_value = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_total = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_realized = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_unrealized = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_total_pnl = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_total_return = np.empty(self._snap_cap, dtype=np.float64)
+        self._snap_num_pos = np.empty(self._snap_cap, dtype=np.int64)
+        self._snap_comm = np.empty(self._snap_cap, dtype=np.float64)
+        self._n_snap = 0
+
+        # Memoized summary artifacts, keyed on the buffer counters so
+        # print_summary and export_results back-to-back share one
+        # metrics computation and one DataFrame build
+        self._metrics_cache: Optional[Dict] = None
+        self._metrics_cache_key = (-1, -1)
+        self._pdf_cache: Optional[pd.DataFrame] = None
+        self._pdf_cache_n = -1
+
+        # Per-position snapshot rows, columnar like the trade buffers:
+        # symbols are stored as slot indices and only materialized to
+        # strings when the DataFrame is built; the derived fields
+        # (market value, cost basis, unrealized PnL) are recomputed
+        # vectorized at build time rather than stored per row
+        self._psnap_cap = 1024
+        self._psnap_ts = np.empty(self._psnap_cap, dtype='datetime64[ns]')
+        self._psnap_idx = np.empty(self._psnap_cap, dtype=np.int64)
+        self._psnap_qty = np.empty(self._psnap_cap, dtype=np.float64)
+        self._psnap_avg = np.empty(self._psnap_cap, dtype=np.float64)
+        self._psnap_px = np.empty(self._psnap_cap, dtype=np.float64)
+        self._n_psnap = 0
+
         self.best_bid_ask: Dict[str, list[tuple[float, float]]] = {}
 
         # Performance tracking
-        self.realized_pnl = 0.0
         self.total_commissions = 0.0
-        
+
+        # Pay the one-time JIT compile (cached across runs) here rather
+        # than on the first recorded fill
+        _w = np.ones(1, dtype=np.float64)
+        apply_signed(0, 1.0, 1.0, 0.0, np.zeros(1), np.zeros(1),
+                     _w.copy(), _w.copy())
+
+    @property
+    def cash(self) -> float:
+        """Available cash balance."""
+        return float(self._cash[0])
+
+    @cash.setter
+    def cash(self, value: float) -> None:
+        self._cash[0] = value
+
+    @property
+    def realized_pnl(self) -> float:
+        """Cumulative realized PnL net of commissions."""
+        return float(self._realized[0])
+
+    @realized_pnl.setter
+    def realized_pnl(self, value: float) -> None:
+        self._realized[0] = value
+
     def record_trade(self, timestamp, symbol: str, action: str, 
                      quantity: float, price: float, 
                      best_bid: float, best_ask: float) -> Trade:
@@ -99,219 +186,431 @@ class PortfolioTracker:
         Returns:
             Trade object
         """
-        commission = quantity * price * self.commission_rate
-        if action == "buy":
-            trade_created = self._execute_buy(symbol, quantity, price, commission)
-        elif action == "sell":
-            trade_created = self._execute_sell(symbol, quantity, price, commission)
-        elif action == "close":
-            trade_created = self.close_position(symbol, price)
+        # One symbol -> slot lookup per call; everything downstream
+        # works on the integer index
+        idx = self._sym_idx.get(symbol)
+        active = idx is not None and self._active[idx]
+        code = self._ACTION_CODES[action]
+        # Collapse the action to one signed quantity (> 0 buys,
+        # < 0 sells); a close fills the held quantity in the opposing
+        # direction, so its commission is charged on what's held
+        if code == 2:
+            signed_qty = -self._qty[idx] if active else 0.0
+        else:
+            signed_qty = quantity if code == 0 else -quantity
+
+        if code == 2 and not active:
+            print(f"No position to close for {symbol}")
+            commission = None
+        else:
+            commission = self._apply_fill(symbol, idx, signed_qty, price)
 
         self.best_bid_ask.setdefault(symbol, []).append((best_bid, best_ask))
-        if trade_created:
-            trade = Trade(timestamp, symbol, action, quantity, price, commission)
-            self.trades.append(trade)
+        if commission is not None:
+            n = self._n_trades
+            if n == self._trade_cap:
+                self._grow_trade_buffers()
+            self._trade_ts[n] = np.datetime64(timestamp)
+            self._trade_sym[n] = symbol
+            self._trade_action[n] = code
+            self._trade_qty[n] = quantity
+            self._trade_price[n] = price
+            self._trade_comm[n] = commission
+            self._n_trades = n + 1
             self.total_commissions += commission
-            
 
-    
-    def _execute_buy(self, symbol: str, quantity: float, price: float, commission: float):
-        """Execute a buy order"""
-        cost = quantity * price + commission
-        
-        if cost > self.cash:
-            print(f"Warning: Insufficient cash for buy. Need {cost}, have {self.cash}")
-            return False
-            
-        self.cash -= cost
-        
-        if symbol in self.positions:
-            # Update average price for existing position
-            current_qty = self.positions[symbol]['quantity']
-            current_avg = self.positions[symbol]['avg_price']
-            new_qty = current_qty + quantity
-            new_avg = ((current_qty * current_avg) + (quantity * price)) / new_qty
-            
-            self.positions[symbol]['quantity'] = new_qty
-            self.positions[symbol]['avg_price'] = new_avg
+    _ACTION_CODES = {'buy': 0, 'sell': 1, 'close': 2}
+    _ACTION_NAMES = np.array(['buy', 'sell', 'close'], dtype=object)
+
+    def record_trades(self, timestamps, symbols, actions, quantities,
+                      prices) -> np.ndarray:
+        """
+        Record a whole batch of fills at once: symbols resolve to slot
+        indices in one cold pass, the buy/sell/close arithmetic runs as
+        a single compiled sweep, and executed fills bulk-append to the
+        trade columns. Amortizes the per-fill Python dispatch of
+        record_trade across the batch.
+
+        Args:
+            timestamps: Per-fill timestamps
+            symbols: Per-fill symbols
+            actions: Per-fill 'buy'/'sell'/'close' strings or uint8
+                     codes (0/1/2)
+            quantities, prices: Per-fill float arrays
+
+        Returns:
+            Boolean mask of fills that executed
+        """
+        n = len(symbols)
+        sym_idx = np.empty(n, dtype=np.int64)
+        for k, symbol in enumerate(symbols):
+            idx = self._sym_idx.get(symbol)
+            if idx is None:
+                idx = self._new_slot(symbol)
+            sym_idx[k] = idx
+
+        if len(actions) and isinstance(actions[0], str):
+            act = np.fromiter((self._ACTION_CODES[a] for a in actions),
+                              dtype=np.uint8, count=n)
         else:
-            # New position
-            self.positions[symbol] = {
-                'quantity': quantity,
-                'avg_price': price
-            }
-        return True
-
-    def _execute_sell(self, symbol: str, quantity: float, price: float, commission: float):
-        """Execute a sell order"""
-        if symbol not in self.positions:
-            print(f"Warning: No position in {symbol} to sell")
-            return False
-            
-        if self.positions[symbol]['quantity'] < quantity:
-            print(f"Warning: Insufficient quantity to sell. Have {self.positions[symbol]['quantity']}, trying to sell {quantity}")
-            quantity = self.positions[symbol]['quantity']  # Sell what we have
+            act = np.ascontiguousarray(actions, dtype=np.uint8)
+        qty = np.ascontiguousarray(quantities, dtype=np.float64)
+        px = np.ascontiguousarray(prices, dtype=np.float64)
+
+        comm = np.empty(n, dtype=np.float64)
+        ok = apply_trades(sym_idx, act, qty, px, self.commission_rate,
+                          self._qty, self._avg, self._active,
+                          self._cash, self._realized, comm)
+
+        m = int(np.count_nonzero(ok))
+        if m:
+            while self._n_trades + m > self._trade_cap:
+                self._grow_trade_buffers()
+            i, j = self._n_trades, self._n_trades + m
+            self._trade_ts[i:j] = np.asarray(timestamps, dtype='datetime64[ns]')[ok]
+            self._trade_sym[i:j] = np.asarray(symbols, dtype=object)[ok]
+            self._trade_action[i:j] = act[ok]
+            self._trade_qty[i:j] = qty[ok]
+            self._trade_price[i:j] = px[ok]
+            self._trade_comm[i:j] = comm[ok]
+            self._n_trades = j
+            self.total_commissions += float(comm[ok].sum())
+        return ok
+
+    def _grow_trade_buffers(self) -> None:
+        """Double the trade column capacity."""
+        self._trade_cap *= 2
+        self._trade_ts = np.resize(self._trade_ts, self._trade_cap)
+        self._trade_sym = np.resize(self._trade_sym, self._trade_cap)
+        self._trade_action = np.resize(self._trade_action, self._trade_cap)
+        self._trade_qty = np.resize(self._trade_qty, self._trade_cap)
+        self._trade_price = np.resize(self._trade_price, self._trade_cap)
+        self._trade_comm = np.resize(self._trade_comm, self._trade_cap)
+
+    @property
+    def trades(self) -> List[Trade]:
+        """Trade history materialized as Trade objects (legacy shape;
+        built on demand from the columns)."""
+        return [Trade(self._trade_ts[i], self._trade_sym[i],
+                      self._ACTION_NAMES[self._trade_action[i]],
+                      self._trade_qty[i], self._trade_price[i],
+                      self._trade_comm[i])
+                for i in range(self._n_trades)]
             
-        proceeds = quantity * price - commission
-        self.cash += proceeds
-        
-        # Calculate realized PnL
-        avg_price = self.positions[symbol]['avg_price']
-        realized = (price - avg_price) * quantity - commission
-        self.realized_pnl += realized
-        
-        # Update position
-        self.positions[symbol]['quantity'] -= quantity
-        
-        # Remove position if quantity is zero or negative
-        if self.positions[symbol]['quantity'] <= 1e-8:  # Account for floating point precision
-            del self.positions[symbol]
 
-        return True
     
+    def _new_slot(self, symbol: str) -> int:
+        """Assign an array slot to a symbol seen for the first time,
+        doubling the column capacity when full."""
+        idx = len(self._idx_to_sym)
+        self._idx_to_sym.append(symbol)
+        if idx >= self._pos_cap:
+            self._pos_cap *= 2
+            self._qty = np.resize(self._qty, self._pos_cap)
+            self._avg = np.resize(self._avg, self._pos_cap)
+            self._active = np.resize(self._active, self._pos_cap)
+            self._qty[idx:] = 0.0
+            self._avg[idx:] = 0.0
+            self._active[idx:] = False
+        self._sym_idx[symbol] = idx
+        return idx
+
+    def _apply_fill(self, symbol: str, idx: Optional[int],
+                    signed_qty: float, price: float) -> Optional[float]:
+        """Validate and execute one signed fill (> 0 buys, < 0 sells)
+        against slot `idx` (None for a symbol without a slot yet).
+        Warnings and slot bookkeeping stay in Python; the arithmetic is
+        one call into the unified compiled kernel.
+
+        Returns:
+            The commission charged, or None if the fill was refused
+        """
+        if signed_qty > 0.0:
+            cost = signed_qty * price * (1.0 + self.commission_rate)
+            if cost > self._cash[0]:
+                print(f"Warning: Insufficient cash for buy. Need {cost}, have {self.cash}")
+                return None
+            if idx is None:
+                idx = self._new_slot(symbol)  # fresh slot is zeroed; kernel blends avg to price
+            self._active[idx] = True  # re-entry just relights the slot
+        else:
+            if idx is None or not self._active[idx]:
+                print(f"Warning: No position in {symbol} to sell")
+                return None
+            if self._qty[idx] < -signed_qty:
+                print(f"Warning: Insufficient quantity to sell. Have {self._qty[idx]}, trying to sell {-signed_qty}")
+
+        commission = apply_signed(idx, signed_qty, price, self.commission_rate,
+                                  self._qty, self._avg, self._cash, self._realized)
+
+        # Retire the slot if quantity sold down to zero - the symbol
+        # keeps its index, so re-entering costs no dict mutation
+        if signed_qty < 0.0 and self._qty[idx] <= 1e-8:  # Account for floating point precision
+            self._qty[idx] = 0.0
+            self._avg[idx] = 0.0
+            self._active[idx] = False
+
+        return commission
+
     def close_position(self, symbol: str, price: float):
-        #check if long or short and then execute sell or buy accordingly
-        position = self.get_current_position(symbol)
-        if not position:
+        """Close out the position in `symbol` at `price`."""
+        idx = self._sym_idx.get(symbol)
+        if idx is None or not self._active[idx]:
             print(f"No position to close for {symbol}")
             return False
-        
-        if position['quantity'] > 0:
-            return self._execute_sell(symbol, position['quantity'], price, position['quantity'] * price * self.commission_rate)
-        elif position['quantity'] < 0:
-            return self._execute_buy(symbol, abs(position['quantity']), price, abs(position['quantity']) * price * self.commission_rate)
-        return True
+        return self._apply_fill(symbol, idx, -self._qty[idx], price) is not None
 
 
     def record_portfolio_snapshot(self, timestamp, current_prices: Dict[str, float]):
         """
         Record a snapshot of the portfolio at a point in time
-        
+
         Args:
             timestamp: Snapshot timestamp
             current_prices: Dict of {symbol: current_price}
         """
-        # Calculate portfolio metrics
+        # Align the dict to the slot index once; the aggregation itself
+        # is array-native. Callers that already hold index-aligned
+        # prices can skip this and call record_portfolio_snapshot_arr.
+        n_slots = len(self._idx_to_sym)
+        prices = np.fromiter((current_prices.get(s, np.nan) for s in self._idx_to_sym),
+                             dtype=np.float64, count=n_slots)
+        self.record_portfolio_snapshot_arr(timestamp, prices)
+
+    def record_portfolio_snapshot_arr(self, timestamp, prices: np.ndarray):
+        """
+        Array-native snapshot: `prices[i]` is the price for position
+        slot `i` (NaN when unknown). No dict hashing on this path, so
+        a caller keeping an aligned price array pays pure numpy.
+
+        Args:
+            timestamp: Snapshot timestamp
+            prices: float64 array aligned to the slot index
+        """
+        # Aggregate over all positions with three whole-array ops
+        # instead of per-symbol Python arithmetic
         total_position_value = 0.0
         unrealized_pnl = 0.0
-        
-        # Record individual position snapshots
-        for symbol, position in self.positions.items():
-            current_price = current_prices.get(symbol)
-            if current_price is None:
-                print(f"Warning: No price data for {symbol}")
-                continue
-                
-            snapshot = PositionSnapshot(
-                timestamp=timestamp,
-                symbol=symbol,
-                quantity=position['quantity'],
-                avg_entry_price=position['avg_price'],
-                current_price=current_price
-            )
-            self.position_snapshots.append(snapshot)
-            
-            total_position_value += snapshot.market_value
-            unrealized_pnl += snapshot.unrealized_pnl
-        
-        # Record overall portfolio snapshot
-        total_value = self.cash + total_position_value
-        total_pnl = self.realized_pnl + unrealized_pnl
-        
-        portfolio_snapshot = {
-            'timestamp': timestamp,
-            'cash': self.cash,
-            'position_value': total_position_value,
-            'total_value': total_value,
-            'realized_pnl': self.realized_pnl,
-            'unrealized_pnl': unrealized_pnl,
-            'total_pnl': total_pnl,
-            'total_return': (total_value - self.initial_cash) / self.initial_cash,
-            'num_positions': len(self.positions),
-            'commissions': self.total_commissions
-        }
-        
-        self.portfolio_snapshots.append(portfolio_snapshot)
+        num_positions = 0
+        n = len(self._idx_to_sym)
+        if n:
+            active = self._active[:n]
+            num_positions = int(np.count_nonzero(active))
+            px = prices[:n]
+            valid = active & ~np.isnan(px)
+            missing = np.nonzero(active & ~valid)[0]
+            for i in missing:
+                print(f"Warning: No price data for {self._idx_to_sym[i]}")
+
+            qty = self._qty[:n]
+            mv = qty * px
+            upnl = mv - qty * self._avg[:n]
+            total_position_value = float(mv[valid].sum())
+            unrealized_pnl = float(upnl[valid].sum())
+
+            # Record individual position snapshots straight into the
+            # columns with fancy indexing - no per-position objects
+            rows = np.nonzero(valid)[0]
+            m = rows.shape[0]
+            if m:
+                while self._n_psnap + m > self._psnap_cap:
+                    self._grow_psnap_buffers()
+                i, j = self._n_psnap, self._n_psnap + m
+                self._psnap_ts[i:j] = np.datetime64(timestamp)
+                self._psnap_idx[i:j] = rows
+                self._psnap_qty[i:j] = qty[rows]
+                self._psnap_avg[i:j] = self._avg[rows]
+                self._psnap_px[i:j] = px[rows]
+                self._n_psnap = j
+
+        # Record overall portfolio snapshot into the columns
+        total_value = self._cash[0] + total_position_value
+
+        k = self._n_snap
+        if k == self._snap_cap:
+            self._grow_snap_buffers()
+        self._snap_ts[k] = np.datetime64(timestamp)
+        self._snap_cash[k] = self._cash[0]
+        self._snap_pos_value[k] = total_position_value
+        self._snap_total[k] = total_value
+        self._snap_realized[k] = self._realized[0]
+        self._snap_unrealized[k] = unrealized_pnl
+        self._snap_total_pnl[k] = self._realized[0] + unrealized_pnl
+        self._snap_total_return[k] = (total_value - self.initial_cash) * self._initial_cash_inv
+        self._snap_num_pos[k] = num_positions
+        self._snap_comm[k] = self.total_commissions
+        self._n_snap = k + 1
+
+    def _grow_snap_buffers(self) -> None:
+        """Double the portfolio snapshot column capacity."""
+        self._snap_cap *= 2
+        for name in ('_snap_ts', '_snap_cash', '_snap_pos_value',
+                     '_snap_total', '_snap_realized', '_snap_unrealized',
+                     '_snap_total_pnl', '_snap_total_return',
+                     '_snap_num_pos', '_snap_comm'):
+            setattr(self, name, np.resize(getattr(self, name), self._snap_cap))
+
+    def _grow_psnap_buffers(self) -> None:
+        """Double the per-position snapshot column capacity."""
+        self._psnap_cap *= 2
+        for name in ('_psnap_ts', '_psnap_idx', '_psnap_qty',
+                     '_psnap_avg', '_psnap_px'):
+            setattr(self, name, np.resize(getattr(self, name), self._psnap_cap))
+
+    @property
+    def position_snapshots(self) -> List[PositionSnapshot]:
+        """Per-position snapshot history materialized as
+        PositionSnapshot objects (legacy shape; built on demand from
+        the columns)."""
+        return [PositionSnapshot(self._psnap_ts[i],
+                                 self._idx_to_sym[int(self._psnap_idx[i])],
+                                 self._psnap_qty[i], self._psnap_avg[i],
+                                 self._psnap_px[i])
+                for i in range(self._n_psnap)]
+
+    @property
+    def portfolio_snapshots(self) -> List[Dict]:
+        """Snapshot history in the legacy list-of-dicts shape (built on
+        demand from the columns)."""
+        df = self.get_portfolio_df()
+        return df.to_dict('records') if not df.empty else []
     
     def get_current_position(self, symbol: str) -> Optional[Dict]:
         """Get current position for a symbol"""
-        return self.positions.get(symbol)
-    
+        idx = self._sym_idx.get(symbol)
+        if idx is None or not self._active[idx]:
+            return None
+        return {'quantity': self._qty[idx], 'avg_price': self._avg[idx]}
+
     def get_all_positions(self) -> Dict[str, Dict]:
         """Get all current positions"""
-        return self.positions.copy()
-    
+        return {symbol: {'quantity': self._qty[idx], 'avg_price': self._avg[idx]}
+                for symbol, idx in self._sym_idx.items() if self._active[idx]}
+
+    @property
+    def positions(self) -> Dict[str, Dict]:
+        """Current positions in the legacy dict shape (built on demand
+        from the position arrays)."""
+        return self.get_all_positions()
+
     def get_portfolio_value(self, current_prices: Dict[str, float]) -> float:
         """Calculate current portfolio value"""
-        position_value = sum(
-            pos['quantity'] * current_prices.get(symbol, pos['avg_price'])
-            for symbol, pos in self.positions.items()
+        n = len(self._idx_to_sym)
+        if n == 0:
+            return self.cash
+        # Align the dict to slot order once, then hand off to the dot
+        # product; NaN marks a missing quote
+        prices = np.fromiter(
+            (current_prices.get(sym, np.nan) for sym in self._idx_to_sym),
+            dtype=np.float64, count=n
         )
-        return self.cash + position_value
+        return self.get_portfolio_value_arr(prices)
+
+    def get_portfolio_value_arr(self, prices: np.ndarray) -> float:
+        """
+        Calculate current portfolio value from a price array aligned to
+        the position slots: one dot product instead of a dict lookup and
+        a Python multiply per symbol. Slots priced NaN fall back to
+        their average entry price (matching the dict path's behaviour
+        for symbols without a quote).
+        """
+        n = len(self._idx_to_sym)
+        if n == 0:
+            return self.cash
+        px = np.where(np.isnan(prices), self._avg[:n], prices)
+        return self.cash + float(self._qty[:n] @ px)
     
     def get_trades_df(self) -> pd.DataFrame:
         """Get trade history as DataFrame"""
-        if not self.trades:
+        n = self._n_trades
+        if n == 0:
             return pd.DataFrame()
-        return pd.DataFrame([t.to_dict() for t in self.trades])
+        qty = self._trade_qty[:n]
+        price = self._trade_price[:n]
+        # Typed columns straight into pandas: no per-row dicts and no
+        # per-column type inference
+        return pd.DataFrame({
+            'timestamp': self._trade_ts[:n],
+            'symbol': self._trade_sym[:n],
+            'action': np.take(self._ACTION_NAMES, self._trade_action[:n]),
+            'quantity': qty,
+            'price': price,
+            'commission': self._trade_comm[:n],
+            'value': qty * price,
+        })
     
     def get_portfolio_df(self) -> pd.DataFrame:
-        """Get portfolio snapshots as DataFrame"""
-        if not self.portfolio_snapshots:
+        """Get portfolio snapshots as DataFrame (cached until the next
+        snapshot arrives)"""
+        n = self._n_snap
+        if n == 0:
             return pd.DataFrame()
-        return pd.DataFrame(self.portfolio_snapshots)
+        if n == self._pdf_cache_n:
+            return self._pdf_cache
+        self._pdf_cache_n = n
+        self._pdf_cache = pd.DataFrame({
+            'timestamp': self._snap_ts[:n],
+            'cash': self._snap_cash[:n],
+            'position_value': self._snap_pos_value[:n],
+            'total_value': self._snap_total[:n],
+            'realized_pnl': self._snap_realized[:n],
+            'unrealized_pnl': self._snap_unrealized[:n],
+            'total_pnl': self._snap_total_pnl[:n],
+            'total_return': self._snap_total_return[:n],
+            'num_positions': self._snap_num_pos[:n],
+            'commissions': self._snap_comm[:n],
+        })
+        return self._pdf_cache
     
     def get_positions_df(self) -> pd.DataFrame:
         """Get position snapshots as DataFrame"""
-        if not self.position_snapshots:
+        k = self._n_psnap
+        if k == 0:
             return pd.DataFrame()
-        return pd.DataFrame([p.to_dict() for p in self.position_snapshots])
+        qty = self._psnap_qty[:k]
+        px = self._psnap_px[:k]
+        mv = qty * px
+        cb = qty * self._psnap_avg[:k]
+        syms = np.array(self._idx_to_sym, dtype=object)
+        return pd.DataFrame({
+            'timestamp': self._psnap_ts[:k],
+            'symbol': np.take(syms, self._psnap_idx[:k]),
+            'quantity': qty,
+            'avg_entry_price': self._psnap_avg[:k],
+            'current_price': px,
+            'market_value': mv,
+            'cost_basis': cb,
+            'unrealized_pnl': mv - cb,
+        })
     
     def calculate_metrics(self) -> Dict:
-        """Calculate performance metrics"""
-        if not self.portfolio_snapshots:
+        """Calculate performance metrics (cached until new snapshots
+        or trades arrive)"""
+        n = self._n_snap
+        if n == 0:
             return {}
-        
-        df = self.get_portfolio_df()
-        
-        # Total return
-        final_value = df['total_value'].iloc[-1]
-        total_return = (final_value - self.initial_cash) / self.initial_cash
-        
-        # Calculate returns series
-        returns = df['total_value'].pct_change().dropna()
-        
+        if (n, self._n_trades) == self._metrics_cache_key:
+            return self._metrics_cache
+
+        values = self._snap_total[:n]
+
+        final_value = float(values[-1])
+        total_return = (final_value - self.initial_cash) * self._initial_cash_inv
+
+        # Returns mean/std and max drawdown in one fused pass instead
+        # of pct_change/cumprod/expanding-max over pandas Series
+        mean_r, std_r, max_drawdown = metrics_core(values)
+
         # Sharpe ratio (assuming 252 trading days per year, 86400 seconds per day)
-        if len(returns) > 1 and returns.std() > 0:
+        if n > 2 and std_r > 0:
             # Estimate periods per year based on timestamp differences
-            if len(df) > 1:
-                time_diff = (df['timestamp'].iloc[-1] - df['timestamp'].iloc[0])
-                if hasattr(time_diff, 'total_seconds'):
-                    total_seconds = time_diff.total_seconds()
-                else:
-                    total_seconds = float(time_diff)
-                    
-                periods_per_year = 365.25 * 24 * 3600 / (total_seconds / len(df))
-            else:
-                periods_per_year = 252  # Default to daily
-                
-            sharpe = returns.mean() / returns.std() * np.sqrt(periods_per_year)
+            total_seconds = (self._snap_ts[n - 1] - self._snap_ts[0]) / np.timedelta64(1, 's')
+            periods_per_year = 365.25 * 24 * 3600 / (total_seconds / n)
+            sharpe = mean_r / std_r * np.sqrt(periods_per_year)
         else:
             sharpe = 0.0
-        
-        # Max drawdown
-        cumulative = (1 + returns).cumprod()
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min() if len(drawdown) > 0 else 0.0
-        
-        # Win rate
-        trades_df = self.get_trades_df()
-        if len(trades_df) > 0:
-            # Calculate PnL per trade (for closed positions)
-            num_trades = len(trades_df)
-        else:
-            num_trades = 0
+
+        num_trades = self._n_trades
         
         metrics = {
             'initial_capital': self.initial_cash,
@@ -325,18 +624,32 @@ class PortfolioTracker:
             'num_trades': num_trades,
             'total_commissions': self.total_commissions,
         }
-        
+
+        self._metrics_cache = metrics
+        self._metrics_cache_key = (n, self._n_trades)
         return metrics
     
-    def plot_portfolio_value(self, save_path: Optional[str] = None):
-        """Plot portfolio value over time"""
+    def plot_portfolio_value(self, save_path: Optional[str] = None,
+                             max_points: int = 5000):
+        """Plot portfolio value over time
+
+        Args:
+            save_path: Optional path to save the figure to
+            max_points: Downsample the series to roughly this many
+                points before plotting - long runs produce far more
+                snapshots than the figure has pixels, and matplotlib
+                buffers a vertex per point
+        """
         df = self.get_portfolio_df()
         if df.empty:
             print("No data to plot")
             return
-        
+
+        if len(df) > max_points:
+            df = df.iloc[::len(df) // max_points]
+
         fig, axes = plt.subplots(3, 1, figsize=(12, 10))
-        
+
         # Portfolio value
         axes[0].plot(df['timestamp'], df['total_value'], label='Total Value')
         axes[0].plot(df['timestamp'], df['cash'], label='Cash', alpha=0.7)
@@ -364,43 +677,66 @@ class PortfolioTracker:
         axes[2].set_title('Cumulative Returns')
         axes[2].grid(True, alpha=0.3)
         
+        # Dense traces compress better rasterized than as vector paths
+        for ax in axes:
+            for line in ax.get_lines():
+                line.set_rasterized(True)
+
         plt.tight_layout()
-        
+
         if save_path:
             plt.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"Plot saved to {save_path}")
-        
+
         plt.show()
     
-    def export_results(self, output_dir: str = "./backtest_results"):
-        """Export all results to CSV files"""
+    def export_results(self, output_dir: str = "./backtest_results",
+                       export_format: str = "parquet"):
+        """
+        Export all results to disk.
+        Snapshots are buffered in memory during the run, so each file is
+        one batched write at shutdown rather than per-tick I/O.
+
+        Args:
+            output_dir: Directory to write result files into
+            export_format: 'parquet' (default - columnar binary, far
+                faster to write and reload than per-cell CSV text) or
+                'csv'. Falls back to CSV when pyarrow is not installed.
+        """
         import os
         os.makedirs(output_dir, exist_ok=True)
-        
-        # Export trades
-        trades_df = self.get_trades_df()
-        if not trades_df.empty:
-            trades_df.to_csv(f"{output_dir}/trades.csv", index=False)
-            print(f"Trades exported to {output_dir}/trades.csv")
-        
-        # Export portfolio snapshots
-        portfolio_df = self.get_portfolio_df()
-        if not portfolio_df.empty:
-            portfolio_df.to_csv(f"{output_dir}/portfolio.csv", index=False)
-            print(f"Portfolio history exported to {output_dir}/portfolio.csv")
-        
-        # Export position snapshots
-        positions_df = self.get_positions_df()
-        if not positions_df.empty:
-            positions_df.to_csv(f"{output_dir}/positions.csv", index=False)
-            print(f"Position history exported to {output_dir}/positions.csv")
-        
-        # Export metrics
+
+        if export_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401 - just probing the engine
+            except ImportError:
+                print("pyarrow not installed - exporting CSV instead")
+                export_format = "csv"
+
+        def write(df: pd.DataFrame, name: str, label: str) -> None:
+            if df.empty:
+                return
+            if export_format == "parquet":
+                path = f"{output_dir}/{name}.parquet"
+                df.to_parquet(path, engine='pyarrow', compression='snappy')
+            else:
+                path = f"{output_dir}/{name}.csv"
+                df.to_csv(path, index=False, lineterminator='\n')
+            print(f"{label} exported to {path}")
+
+        write(self.get_trades_df(), "trades", "Trades")
+        write(self.get_portfolio_df(), "portfolio", "Portfolio history")
+        write(self.get_positions_df(), "positions", "Position history")
+
+        # Metrics are one flat dict - dump them as JSON directly rather
+        # than building a length-1 DataFrame just to call to_csv
         metrics = self.calculate_metrics()
         if metrics:
-            metrics_df = pd.DataFrame([metrics])
-            metrics_df.to_csv(f"{output_dir}/metrics.csv", index=False)
-            print(f"Metrics exported to {output_dir}/metrics.csv")
+            import json
+            path = f"{output_dir}/metrics.json"
+            with open(path, "w") as f:
+                json.dump(metrics, f, indent=2, default=float)
+            print(f"Metrics exported to {path}")
     
     def print_summary(self):
         """Print a summary of the backtest results"""
@@ -420,16 +756,22 @@ class PortfolioTracker:
         print("="*60 + "\n")
 
 
-    def plot_prices(self, save_path: Optional[str] = None):
+    def plot_prices(self, save_path: Optional[str] = None,
+                    max_points: int = 5000):
         """plot bid and ask prices over time"""
         if not self.best_bid_ask:
             print("No price data to plot")
             return
-        
+
         for symbol, prices in self.best_bid_ask.items():
             bids, asks = zip(*prices)
             timestamps = range(len(bids))
-            
+            if len(bids) > max_points:
+                stride = len(bids) // max_points
+                bids = bids[::stride]
+                asks = asks[::stride]
+                timestamps = timestamps[::stride]
+
             plt.figure(figsize=(12, 6))
             plt.plot(timestamps, bids, label='Best Bid', color='green')
             plt.plot(timestamps, asks, label='Best Ask', color='red')
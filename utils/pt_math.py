@@ -0,0 +1,168 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to plain Python
+    njit = None
+
+
+def _apply_signed(idx, signed_qty, price, commission_rate,
+                  qty_arr, avg_arr, cash_arr, realized_arr):
+    """
+    Unified fill kernel: one signed quantity (> 0 buys, < 0 sells)
+    replaces the separate buy and sell kernels. Cash delta, realized
+    PnL, and the average-price blend are selected with arithmetic masks
+    rather than branches, so the compiled body is a single straight-line
+    path. The max() clamps oversells to the held quantity; commission is
+    charged on the requested quantity (matching the old scalar path).
+    Callers validate first: sells need an active slot, buys a cash
+    check. Cash and realized PnL live in length-1 arrays so the
+    compiled kernel can mutate them.
+
+    Returns:
+        The commission charged
+    """
+    cur = qty_arr[idx]
+    comm = abs(signed_qty) * price * commission_rate
+    buy = (signed_qty > 0.0) * 1.0
+    fill = max(signed_qty, -cur)  # no-op for buys, clamps oversells
+    cash_arr[0] -= fill * price + comm
+    realized_arr[0] += (1.0 - buy) * ((avg_arr[idx] - price) * fill - comm)
+    # Sells leave avg untouched (buy mask zeroes the blend terms); a
+    # fresh slot (qty 0) blends to avg == price
+    avg_arr[idx] = (cur * avg_arr[idx] + buy * fill * price) / (cur + buy * fill)
+    qty_arr[idx] = cur + fill
+    return comm
+
+
+def _apply_trades(sym_idx, action, qty, price, commission_rate,
+                  qty_arr, avg_arr, active_arr, cash_arr, realized_arr,
+                  comm_out):
+    """
+    Sweep a whole batch of fills through the position columns in order:
+    the same buy/sell/close arithmetic as the scalar kernels, but one
+    compiled call for N fills instead of N Python dispatches. Actions
+    are codes (0=buy, 1=sell, 2=close); close resolves to a fill of the
+    held quantity. Commissions are computed per fill from the requested
+    quantity (matching the scalar path) and written to comm_out.
+
+    Returns:
+        Boolean mask of fills that executed
+    """
+    n = sym_idx.shape[0]
+    ok = np.empty(n, dtype=np.bool_)
+    for k in range(n):
+        idx = sym_idx[k]
+        a = action[k]
+        q = qty[k]
+        p = price[k]
+
+        if a == 2:  # close: fill the held quantity in the opposing direction
+            held = qty_arr[idx]
+            if not active_arr[idx] or held == 0.0:
+                ok[k] = False
+                comm_out[k] = 0.0
+                continue
+            if held > 0.0:
+                a = 1
+                q = held
+            else:
+                a = 0
+                q = -held
+
+        c = q * p * commission_rate
+
+        if a == 0:  # buy
+            cost = q * p + c
+            if cost > cash_arr[0]:
+                ok[k] = False
+                comm_out[k] = 0.0
+                continue
+            cash_arr[0] -= cost
+            cur = qty_arr[idx]
+            new_q = cur + q
+            avg_arr[idx] = (cur * avg_arr[idx] + q * p) / new_q
+            qty_arr[idx] = new_q
+            active_arr[idx] = True
+        else:  # sell (clamped to the held quantity)
+            if not active_arr[idx]:
+                ok[k] = False
+                comm_out[k] = 0.0
+                continue
+            held = qty_arr[idx]
+            if q > held:
+                q = held
+            cash_arr[0] += q * p - c
+            realized_arr[0] += (p - avg_arr[idx]) * q - c
+            qty_arr[idx] = held - q
+            if qty_arr[idx] <= 1e-8:
+                qty_arr[idx] = 0.0
+                avg_arr[idx] = 0.0
+                active_arr[idx] = False
+
+        ok[k] = True
+        comm_out[k] = c
+    return ok
+
+
+def _metrics_core(values):
+    """
+    Fused summary statistics over the portfolio value series: one pass
+    computes per-period returns, their mean and sample std (ddof=1,
+    matching pandas), and the max drawdown - instead of four pandas
+    passes with a temporary Series each. Drawdown runs straight off the
+    value series: compounding the returns back up just reproduces
+    values[i] / values[0], and the v[0] scale cancels in the ratio, so
+    the cumprod detour is skipped entirely.
+
+    Returns:
+        (mean_return, std_return, max_drawdown)
+    """
+    n = values.shape[0]
+    if n < 2:
+        return 0.0, 0.0, 0.0
+    sum_r = 0.0
+    sum_r2 = 0.0
+    run_max = values[0]
+    max_dd = 0.0
+    for i in range(1, n):
+        v = values[i]
+        r = v / values[i - 1] - 1.0
+        sum_r += r
+        sum_r2 += r * r
+        if v > run_max:
+            run_max = v
+        dd = (v - run_max) / run_max
+        if dd < max_dd:
+            max_dd = dd
+    m = n - 1
+    mean_r = sum_r / m
+    if m > 1:
+        var = (sum_r2 - sum_r * sum_r / m) / (m - 1)
+        std_r = np.sqrt(var) if var > 0.0 else 0.0
+    else:
+        std_r = 0.0
+    return mean_r, std_r, max_dd
+
+
+def _metrics_core_numpy(values):
+    """NumPy fallback used when numba is not installed."""
+    n = values.shape[0]
+    if n < 2:
+        return 0.0, 0.0, 0.0
+    r = np.diff(values) / values[:-1]
+    mean_r = float(r.mean())
+    std_r = float(r.std(ddof=1)) if r.shape[0] > 1 else 0.0
+    run_max = np.maximum.accumulate(values)
+    max_dd = float(((values - run_max) / run_max).min())
+    return mean_r, std_r, max_dd
+
+
+if njit is not None:
+    apply_signed = njit(cache=True, nogil=True)(_apply_signed)
+    apply_trades = njit(cache=True, nogil=True)(_apply_trades)
+    metrics_core = njit(cache=True, nogil=True)(_metrics_core)
+else:
+    apply_signed = _apply_signed
+    apply_trades = _apply_trades
+    metrics_core = _metrics_core_numpy
@@ -0,0 +1,69 @@
+import asyncio
+
+
+class SPSCRing:
+    """
+    Fixed-capacity single-producer single-consumer ring buffer with the
+    subset of the asyncio.Queue surface the pipeline uses (put, get,
+    get_nowait, empty). Hand-off is an array store plus an index bump;
+    the consumer only touches the asyncio.Event on the empty->non-empty
+    transition, so wakeups are coalesced instead of allocating a waiter
+    future per event like asyncio.Queue does.
+
+    By default the ring is lossless: put() waits for space
+    (backpressure) and put_nowait() raises asyncio.QueueFull. Pass
+    overwrite=True to drop the oldest entry instead when full - right
+    for market-data queues where only the freshest snapshot matters,
+    wrong for signal queues where a dropped event is a silently
+    skipped trade (and a leaked pooled Signal).
+    """
+
+    def __init__(self, capacity: int = 1024, overwrite: bool = False):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self._mask = capacity - 1
+        self._buf = [None] * capacity
+        self._head = 0  # producer index
+        self._tail = 0  # consumer index
+        self._overwrite = overwrite
+        self._data_ready = asyncio.Event()
+        self._space_ready = asyncio.Event()
+
+    def put_nowait(self, item) -> None:
+        if self._head - self._tail > self._mask:
+            if not self._overwrite:
+                raise asyncio.QueueFull
+            # Full - drop the oldest entry
+            self._buf[self._tail & self._mask] = None
+            self._tail += 1
+        self._buf[self._head & self._mask] = item
+        self._head += 1
+        if not self._data_ready.is_set():
+            self._data_ready.set()
+
+    async def put(self, item) -> None:
+        if not self._overwrite:
+            while self._head - self._tail > self._mask:
+                self._space_ready.clear()
+                await self._space_ready.wait()
+        self.put_nowait(item)
+
+    def empty(self) -> bool:
+        return self._head == self._tail
+
+    def get_nowait(self):
+        if self._head == self._tail:
+            raise asyncio.QueueEmpty
+        slot = self._tail & self._mask
+        item = self._buf[slot]
+        self._buf[slot] = None
+        self._tail += 1
+        if not self._space_ready.is_set():
+            self._space_ready.set()
+        return item
+
+    async def get(self):
+        while self._head == self._tail:
+            self._data_ready.clear()
+            await self._data_ready.wait()
+        return self.get_nowait()
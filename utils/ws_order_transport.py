@@ -0,0 +1,77 @@
+import asyncio
+import itertools
+import json
+import sys
+import websockets
+
+
+class WSOrderTransport:
+    """
+    Submits orders over a single authenticated WebSocket connection.
+    Each order becomes one frame on a kept-alive socket (no HTTP
+    headers, no new connection setup); replies are matched back to the
+    caller by request id.
+    """
+
+    def __init__(self, url: str, api_key: str, api_secret: str, verbose: bool = False):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.verbose = verbose
+        self.ws = None
+        self._req_counter = itertools.count(1)
+        self._pending = {}  # req_id -> Future awaiting the ack
+        self._reader_task = None
+
+    async def start(self):
+        """Connect, authenticate once, and spawn the ack reader"""
+        self.ws = await websockets.connect(self.url, ping_interval=20)
+        await self.ws.send(json.dumps({
+            "action": "auth",
+            "key": self.api_key,
+            "secret": self.api_secret
+        }))
+        self._reader_task = asyncio.create_task(self._read_loop(), name="ws_order_reader")
+
+    async def send(self, order: dict) -> dict:
+        """Send one order frame and await its ack"""
+        req_id = next(self._req_counter)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = future
+        try:
+            await self.ws.send(json.dumps({"op": "order.create", "req_id": req_id, **order}))
+            return await future
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def _read_loop(self):
+        """Complete pending futures as acks arrive"""
+        try:
+            async for message in self.ws:
+                try:
+                    reply = json.loads(message)
+                except ValueError:
+                    continue
+                future = self._pending.get(reply.get("req_id"))
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.verbose:
+                print(f"Error in WS order reader: {e}", file=sys.stderr, flush=True)
+            # Fail any callers still waiting on this connection
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        """Stop the reader and close the socket"""
+        if self._reader_task is not None and not self._reader_task.done():
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        if self.ws is not None:
+            await self.ws.close()